@@ -140,15 +140,15 @@ class AdvancedForecastingAPI:
                 selector = SmartModelSelector(request.metric_type)
                 selection_result = selector.select_best_model(df)
                 
-                if selection_result['selected_model'] == 'prophet':
-                    model = selection_result['model_object']
-                elif selection_result['selected_model'] == 'arima':
-                    model = selection_result['model_object']
+                if selection_result.selected_model == 'prophet':
+                    model = selection_result.model_object
+                elif selection_result.selected_model == 'arima':
+                    model = selection_result.model_object
                 else:
                     # Fallback to simple forecast
                     return await self._generate_simple_forecast(request, df)
                 
-                model_used = selection_result['selected_model']
+                model_used = selection_result.selected_model
                 
             elif request.model_preference == "prophet":
                 model = EnhancedProphetModel(request.metric_type)
@@ -12,6 +12,14 @@ from typing import Dict, List, Optional, Tuple, Any
 import warnings
 from datetime import datetime, timedelta
 import json
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Suppress Prophet warnings for cleaner output
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -19,27 +27,119 @@ logging.getLogger('prophet').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+# Largest series the STL+ARIMA fast path is used for
+FAST_PATH_MAX_POINTS = 500
+
+# Fixed-width frequencies that can skip pandas DateOffset iteration
+_FREQ_STEPS = {
+    'D': np.timedelta64(1, 'D'),
+    'H': np.timedelta64(1, 'h'),
+    'h': np.timedelta64(1, 'h')
+}
+
+# Prophet configuration per metric type (read-only, copied per instance)
+_PROPHET_CONFIGS = MappingProxyType({
+    'probability': {
+        'growth': 'logistic',
+        'cap': 1.0,
+        'floor': 0.0,
+        'seasonality_mode': 'multiplicative',
+        'yearly_seasonality': True,
+        'weekly_seasonality': True,
+        'daily_seasonality': False,
+        'changepoint_prior_scale': 0.05,
+        'seasonality_prior_scale': 10.0,
+        'holidays_prior_scale': 10.0,
+        'mcmc_samples': 0,
+        'interval_width': 0.80,
+        'uncertainty_samples': 1000
+    },
+    'load': {
+        'growth': 'linear',
+        'seasonality_mode': 'additive',
+        'yearly_seasonality': True,
+        'weekly_seasonality': True,
+        'daily_seasonality': True,
+        'changepoint_prior_scale': 0.1,
+        'seasonality_prior_scale': 10.0,
+        'holidays_prior_scale': 10.0,
+        'mcmc_samples': 0,
+        'interval_width': 0.80,
+        'uncertainty_samples': 1000
+    },
+    'general': {
+        'growth': 'linear',
+        'seasonality_mode': 'additive',
+        'yearly_seasonality': 'auto',
+        'weekly_seasonality': 'auto',
+        'daily_seasonality': 'auto',
+        'changepoint_prior_scale': 0.05,
+        'seasonality_prior_scale': 10.0,
+        'holidays_prior_scale': 10.0,
+        'mcmc_samples': 0,
+        'interval_width': 0.80,
+        'uncertainty_samples': 1000
+    }
+})
+
+def _fit_one(model_cls: type, metric_type: str, data: pd.DataFrame) -> 'EnhancedProphetModel':
+    """Fit a single model in a worker process (module-level so it can be pickled)"""
+    return model_cls(metric_type).fit(data)
+
 class EnhancedProphetModel:
     """
     Enhanced Prophet model with advanced configuration for different metric types
     """
     
-    def __init__(self, metric_type: str = "general"):
+    def __init__(self, metric_type: str = "general", fast_path: bool = False,
+                 uncertainty_samples: Optional[int] = None):
         """
         Initialize Enhanced Prophet Model
         
         Args:
             metric_type: Type of metric ('probability', 'load', 'general')
+            fast_path: Use STL+ARIMA instead of Prophet for small 'general' series
+            uncertainty_samples: Monte Carlo draws for the intervals (0 disables them);
+                defaults to the metric type's configuration
         """
         self.metric_type = metric_type
+        self.fast_path = fast_path
         self.model = None
+        self.fast_model = None
+        self.fast_period = 7
+        self.history_dates = None
         self.forecast = None
+        self._forecast_cache: Dict[int, pd.DataFrame] = {}
         self.performance_metrics = {}
         self.is_fitted = False
         
         # Configuration based on metric type
         self.config = self._get_config_for_metric_type(metric_type)
+        if uncertainty_samples is not None:
+            self.config['uncertainty_samples'] = uncertainty_samples
+        
+    @classmethod
+    def fit_many(cls, series: Dict[str, pd.DataFrame],
+                 max_workers: Optional[int] = None) -> Dict[str, 'EnhancedProphetModel']:
+        """
+        Fit one model per metric type in parallel worker processes
+        
+        Args:
+            series: Training data keyed by metric type
+            max_workers: Maximum number of worker processes (defaults to CPU count)
+            
+        Returns:
+            Fitted models keyed by metric type
+        """
+        logger.info(f"Fitting {len(series)} Prophet models in parallel...")
         
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                metric_type: executor.submit(_fit_one, cls, metric_type, data)
+                for metric_type, data in series.items()
+            }
+            return {metric_type: future.result() for metric_type, future in futures.items()}
+    
     def _get_config_for_metric_type(self, metric_type: str) -> Dict[str, Any]:
         """
         Get Prophet configuration based on metric type
@@ -50,51 +150,7 @@ class EnhancedProphetModel:
         Returns:
             Configuration dictionary
         """
-        configs = {
-            'probability': {
-                'growth': 'logistic',
-                'cap': 1.0,
-                'floor': 0.0,
-                'seasonality_mode': 'multiplicative',
-                'yearly_seasonality': True,
-                'weekly_seasonality': True,
-                'daily_seasonality': False,
-                'changepoint_prior_scale': 0.05,
-                'seasonality_prior_scale': 10.0,
-                'holidays_prior_scale': 10.0,
-                'mcmc_samples': 0,
-                'interval_width': 0.80,
-                'uncertainty_samples': 1000
-            },
-            'load': {
-                'growth': 'linear',
-                'seasonality_mode': 'additive',
-                'yearly_seasonality': True,
-                'weekly_seasonality': True,
-                'daily_seasonality': True,
-                'changepoint_prior_scale': 0.1,
-                'seasonality_prior_scale': 10.0,
-                'holidays_prior_scale': 10.0,
-                'mcmc_samples': 0,
-                'interval_width': 0.80,
-                'uncertainty_samples': 1000
-            },
-            'general': {
-                'growth': 'linear',
-                'seasonality_mode': 'additive',
-                'yearly_seasonality': 'auto',
-                'weekly_seasonality': 'auto',
-                'daily_seasonality': 'auto',
-                'changepoint_prior_scale': 0.05,
-                'seasonality_prior_scale': 10.0,
-                'holidays_prior_scale': 10.0,
-                'mcmc_samples': 0,
-                'interval_width': 0.80,
-                'uncertainty_samples': 1000
-            }
-        }
-        
-        return configs.get(metric_type, configs['general'])
+        return dict(_PROPHET_CONFIGS.get(metric_type, _PROPHET_CONFIGS['general']))
     
     def prepare_data(self, data: pd.DataFrame, date_col: str = 'ds', value_col: str = 'y') -> pd.DataFrame:
         """
@@ -181,6 +237,10 @@ class EnhancedProphetModel:
         Returns:
             Self for method chaining
         """
+        # Probability (logistic cap) and load (multi-seasonality) always need Prophet
+        if self.fast_path and self.metric_type == 'general' and len(data) < FAST_PATH_MAX_POINTS:
+            return self.fit_fast(data, date_col, value_col)
+        
         try:
             # Prepare data
             df = self.prepare_data(data, date_col, value_col)
@@ -210,6 +270,9 @@ class EnhancedProphetModel:
             # Fit the model
             logger.info(f"Fitting Prophet model for {self.metric_type} metric...")
             self.model.fit(df)
+            self.fast_model = None
+            self.history_dates = df['ds']
+            self._forecast_cache.clear()
             
             self.is_fitted = True
             logger.info("Prophet model fitted successfully")
@@ -220,6 +283,98 @@ class EnhancedProphetModel:
             logger.error(f"Error fitting Prophet model: {e}")
             raise
     
+    def fit_fast(self, data: pd.DataFrame, date_col: str = 'ds', value_col: str = 'y',
+                 period: int = 7) -> 'EnhancedProphetModel':
+        """
+        Fit a lightweight STL decomposition + ARIMA(1,1,1) model in place of Prophet
+        
+        Args:
+            data: Training data
+            date_col: Date column name
+            value_col: Value column name
+            period: Seasonal period for the STL decomposition
+            
+        Returns:
+            Self for method chaining
+        """
+        # statsmodels is only needed by this opt-in path, so Prophet-only use skips importing it
+        from statsmodels.tsa.arima.model import ARIMA
+        from statsmodels.tsa.forecasting.stl import STLForecast
+        
+        try:
+            df = self.prepare_data(data, date_col, value_col)
+            
+            # STL needs at least two full seasonal cycles
+            min_points = max(10, 2 * period)
+            if len(df) < min_points:
+                raise ValueError(f"Insufficient data points: {len(df)}. Need at least {min_points} points.")
+            
+            logger.info(f"Fitting STL+ARIMA fast path for {self.metric_type} metric...")
+            self.fast_model = STLForecast(
+                df['y'].to_numpy(dtype=float),
+                ARIMA,
+                model_kwargs={'order': (1, 1, 1)},
+                period=period
+            ).fit()
+            self.fast_period = period
+            self.model = None
+            self.history_dates = df['ds']
+            self._forecast_cache.clear()
+            
+            self.is_fitted = True
+            logger.info("STL+ARIMA model fitted successfully")
+            
+            return self
+            
+        except Exception as e:
+            logger.error(f"Error fitting STL+ARIMA model: {e}")
+            raise
+    
+    def _predict_fast(self, periods: int, freq: str) -> pd.DataFrame:
+        """Build a Prophet-shaped forecast frame from the STL+ARIMA fit"""
+        n_history = len(self.history_dates)
+        prediction = self.fast_model.get_prediction(start=0, end=n_history + periods - 1)
+        frame = prediction.summary_frame(alpha=1 - self.config['interval_width'])
+        
+        # Seasonal component: in-sample from STL, seasonal-naive beyond the history
+        seasonal = self.fast_model.result.seasonal
+        future_seasonal = np.resize(seasonal[n_history - self.fast_period:], periods)
+        weekly = np.concatenate([seasonal, future_seasonal])
+        
+        last_date = self.history_dates.iloc[-1]
+        future_dates = pd.date_range(start=last_date, periods=periods + 1, freq=freq)[1:]
+        
+        yhat = frame['mean'].to_numpy()
+        return pd.DataFrame({
+            'ds': np.concatenate([self.history_dates.to_numpy(), future_dates.to_numpy()]),
+            'trend': yhat - weekly,
+            'weekly': weekly,
+            'yhat_lower': frame['mean_ci_lower'].to_numpy(),
+            'yhat_upper': frame['mean_ci_upper'].to_numpy(),
+            'yhat': yhat
+        })
+    
+    def set_uncertainty_samples(self, uncertainty_samples: Optional[int] = None) -> 'EnhancedProphetModel':
+        """
+        Change the interval Monte Carlo draws of a fitted model
+        
+        Prophet only draws them when predicting, so no refit is needed.
+        
+        Args:
+            uncertainty_samples: Draws for the intervals; None restores the
+                metric type's configuration
+            
+        Returns:
+            Self for method chaining
+        """
+        if uncertainty_samples is None:
+            uncertainty_samples = self._get_config_for_metric_type(self.metric_type)['uncertainty_samples']
+        self.config['uncertainty_samples'] = uncertainty_samples
+        if self.model is not None:
+            self.model.uncertainty_samples = uncertainty_samples
+        self._forecast_cache.clear()
+        return self
+    
     def predict(self, periods: int = 30, freq: str = 'D') -> pd.DataFrame:
         """
         Generate predictions
@@ -235,17 +390,28 @@ class EnhancedProphetModel:
             raise ValueError("Model must be fitted before making predictions")
         
         try:
-            # Create future dataframe
-            future = self.model.make_future_dataframe(periods=periods, freq=freq)
-            
-            # Add capacity constraints for logistic growth
-            if self.config['growth'] == 'logistic':
-                future['cap'] = self.config['cap']
-                if 'floor' in self.config:
-                    future['floor'] = self.config['floor']
+            if self.fast_model is not None:
+                self.forecast = self._predict_fast(periods, freq)
+            else:
+                # Create future dataframe
+                future = self._make_future_dataframe(periods, freq)
+                
+                # Add capacity constraints for logistic growth
+                if self.config['growth'] == 'logistic':
+                    future = self._add_capacity_columns(future)
+                
+                # Generate forecast
+                self.forecast = self.model.predict(future)
+                
+                # Without uncertainty sampling Prophet omits the interval columns;
+                # keep the frame shape callers expect with a zero-width interval
+                if 'yhat_lower' not in self.forecast.columns:
+                    self.forecast['yhat_lower'] = self.forecast['yhat']
+                    self.forecast['yhat_upper'] = self.forecast['yhat']
             
-            # Generate forecast
-            self.forecast = self.model.predict(future)
+            # Daily forecasts are cached by horizon for get_forecast_summary
+            if freq == 'D':
+                self._forecast_cache[periods] = self.forecast
             
             logger.info(f"Generated forecast for {periods} periods")
             return self.forecast
@@ -254,6 +420,29 @@ class EnhancedProphetModel:
             logger.error(f"Error generating predictions: {e}")
             raise
     
+    def _make_future_dataframe(self, periods: int, freq: str) -> pd.DataFrame:
+        """Build the history + future 'ds' frame with numpy datetime arithmetic"""
+        step = _FREQ_STEPS.get(freq)
+        if step is None:
+            return self.model.make_future_dataframe(periods=periods, freq=freq)
+        
+        history = self.model.history_dates.to_numpy()
+        new_dates = history.max() + np.arange(1, periods + 1) * step
+        return pd.DataFrame({'ds': np.concatenate([history, new_dates])})
+    
+    def _add_capacity_columns(self, future: pd.DataFrame) -> pd.DataFrame:
+        """Attach constant cap/floor columns as read-only broadcasts of the scalars"""
+        bounds = {key: self.config[key] for key in ('cap', 'floor') if key in self.config}
+        
+        try:
+            return future.assign(**{
+                key: np.broadcast_to(np.float64(value), len(future))
+                for key, value in bounds.items()
+            })
+        except ValueError:
+            # Fall back to materialized columns if a writable buffer is required
+            return future.assign(**bounds)
+    
     def get_forecast_summary(self, periods: int = 30) -> Dict[str, Any]:
         """
         Get forecast summary with key metrics
@@ -264,11 +453,17 @@ class EnhancedProphetModel:
         Returns:
             Forecast summary dictionary
         """
-        if self.forecast is None:
+        # Serve the horizon from any cached forecast that covers it
+        cached_periods = min([p for p in self._forecast_cache if p >= periods], default=None)
+        if cached_periods is None:
             self.predict(periods)
+            forecast = self.forecast
+        else:
+            forecast = self._forecast_cache[cached_periods]
         
         # Get future predictions only
-        future_forecast = self.forecast.tail(periods)
+        history_length = len(self.history_dates)
+        future_forecast = forecast.iloc[history_length:history_length + periods]
         
         summary = {
             'metric_type': self.metric_type,
@@ -357,26 +552,26 @@ class EnhancedProphetModel:
         anomalies = []
 
         try:
-            # Calculate prediction intervals
-            forecast_df = self.forecast.copy()
+            # Read the prediction intervals as numpy views (no frame copy)
+            y, lo, hi = (self.forecast[c].to_numpy() for c in ('yhat', 'yhat_lower', 'yhat_upper'))
 
             # Identify points outside confidence intervals
-            forecast_df['anomaly_score'] = np.where(
-                (forecast_df['yhat'] < forecast_df['yhat_lower']) |
-                (forecast_df['yhat'] > forecast_df['yhat_upper']),
-                1, 0
-            )
+            idx = np.flatnonzero((y < lo) | (y > hi))
+            anomaly_dates = self.forecast['ds'].iloc[idx]
 
-            # Find anomalous periods
-            anomaly_points = forecast_df[forecast_df['anomaly_score'] == 1]
+            # Severity for all anomalies at once; the categorical shares one
+            # string instance per level instead of one per row
+            y, lo, hi = y[idx], lo[idx], hi[idx]
+            severity_codes = (np.abs(y - lo) > 0.5 * np.abs(hi - lo)).view(np.uint8)
+            severity = pd.Categorical.from_codes(severity_codes, categories=['medium', 'high'])
 
-            for _, row in anomaly_points.iterrows():
+            for i, date in enumerate(anomaly_dates):
                 anomalies.append({
-                    'date': row['ds'].isoformat(),
-                    'predicted_value': float(row['yhat']),
-                    'lower_bound': float(row['yhat_lower']),
-                    'upper_bound': float(row['yhat_upper']),
-                    'severity': 'high' if abs(row['yhat'] - row['yhat_lower']) > abs(row['yhat_upper'] - row['yhat_lower']) * 0.5 else 'medium'
+                    'date': date.isoformat(),
+                    'predicted_value': float(y[i]),
+                    'lower_bound': float(lo[i]),
+                    'upper_bound': float(hi[i]),
+                    'severity': severity[i]
                 })
 
             logger.info(f"Detected {len(anomalies)} potential anomalies")
@@ -399,15 +594,19 @@ class EnhancedProphetModel:
         components = {}
 
         try:
-            # Get Prophet components
-            prophet_components = self.model.predict_components(self.forecast[['ds']])
+            # Prophet already stores every component column in the forecast,
+            # so read them directly instead of re-running the decomposition
+            prophet_components = self.forecast
 
             components['trend'] = prophet_components[['ds', 'trend']]
 
-            # Add seasonality components
+            # Add seasonality components (skip yhat and interval bound columns)
             for col in prophet_components.columns:
-                if col not in ['ds', 'trend'] and not col.startswith('extra_regressors'):
-                    components[col] = prophet_components[['ds', col]]
+                if col in ['ds', 'trend', 'cap', 'floor'] or col.startswith(('yhat', 'extra_regressors')):
+                    continue
+                if col.endswith(('_lower', '_upper')):
+                    continue
+                components[col] = prophet_components[['ds', col]]
 
             logger.info(f"Extracted {len(components)} model components")
 
@@ -433,3 +632,20 @@ class EnhancedProphetModel:
         }
 
         return config_export
+
+    def export_model_config_bytes(self) -> bytes:
+        """
+        Export model configuration as serialized JSON bytes
+
+        Uses orjson when available so the payload can be written directly
+        as an HTTP body or registry record without a dict round-trip.
+
+        Returns:
+            UTF-8 encoded JSON document
+        """
+        config_export = self.export_model_config()
+
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(config_export, option=orjson.OPT_SERIALIZE_NUMPY)
+
+        return json.dumps(config_export, default=float).encode('utf-8')
@@ -0,0 +1,141 @@
+"""
+Fast MiniLM Embeddings
+LangChain-compatible embeddings for sentence-transformers/all-MiniLM-L6-v2 that
+run FP16 on GPU or INT8-quantized ONNX on CPU, encoding texts in batches
+"""
+
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_ONNX_DIR = Path("models") / "all-MiniLM-L6-v2-onnx-int8"
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2 training length
+
+
+class FastMiniLM(Embeddings):
+    """
+    Batched MiniLM embeddings with the fastest available backend
+
+    Backends, in order of preference for backend='auto':
+        - 'torch-fp16': SentenceTransformer in half precision on CUDA
+        - 'onnx-int8': dynamically quantized ONNX export on CPU
+        - 'torch-fp32': SentenceTransformer on CPU (same as HuggingFaceEmbeddings)
+
+    Embeddings are L2-normalized, matching the Normalize layer of
+    all-MiniLM-L6-v2, so vectors stay compatible with existing indexes.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = 64,
+                 backend: str = "auto", onnx_dir: Optional[Path] = None):
+        """
+        Initialize the embedding backend
+
+        Args:
+            model_name: Hugging Face model id
+            batch_size: Texts encoded per forward pass
+            backend: 'auto', 'torch-fp16', 'onnx-int8' or 'torch-fp32'
+            onnx_dir: Where the quantized ONNX model is exported and cached
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.onnx_dir = Path(onnx_dir) if onnx_dir else DEFAULT_ONNX_DIR
+        self.model = None
+        self.tokenizer = None
+
+        if backend == "auto":
+            if SENTENCE_TRANSFORMERS_AVAILABLE and torch.cuda.is_available():
+                backend = "torch-fp16"
+            elif ONNX_AVAILABLE:
+                backend = "onnx-int8"
+            else:
+                backend = "torch-fp32"
+
+        if backend == "torch-fp16":
+            self.model = SentenceTransformer(model_name, device="cuda").half()
+        elif backend == "onnx-int8":
+            self._load_onnx_model()
+        elif backend == "torch-fp32":
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                raise ImportError("sentence-transformers is required for the torch backends")
+            self.model = SentenceTransformer(model_name, device="cpu")
+        else:
+            raise ValueError(f"Unknown embedding backend: {backend}")
+
+        self.backend = backend
+        logger.info(f"MiniLM embeddings using {backend} backend")
+
+    def _load_onnx_model(self):
+        """Load the INT8 ONNX model, exporting and quantizing it on first use"""
+        quantized_file = self.onnx_dir / "model_quantized.onnx"
+        if not quantized_file.exists():
+            logger.info(f"Exporting {self.model_name} to quantized ONNX in {self.onnx_dir}")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True)
+            ort_model.save_pretrained(self.onnx_dir)
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            quantizer.quantize(
+                save_dir=self.onnx_dir,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            )
+            AutoTokenizer.from_pretrained(self.model_name).save_pretrained(self.onnx_dir)
+
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            self.onnx_dir, file_name=quantized_file.name, provider="CPUExecutionProvider"
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(self.onnx_dir)
+
+    def _encode_onnx(self, texts: List[str]) -> np.ndarray:
+        """Mean-pool and normalize ONNX token embeddings batch by batch"""
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + self.batch_size], padding=True, truncation=True,
+                max_length=MAX_SEQ_LENGTH, return_tensors="np"
+            )
+            token_embeddings = np.asarray(self.model(**inputs).last_hidden_state, dtype=np.float32)
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+
+        embeddings = np.concatenate(batches)
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts to an (n, 384) float32 array"""
+        if self.backend == "onnx-int8":
+            return self._encode_onnx(texts)
+        embeddings = self.model.encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents"""
+        if not texts:
+            return []
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self._encode([text])[0].tolist()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Vector Store Index Migration
+Rebuilds the flat FAISS indexes written by data_ingestion.py as HNSW or IVF-PQ
+indexes for sub-linear search. The LangChain docstore pickles are left as-is:
+vectors are re-added in their original order, so index_to_docstore_id still
+maps every position to the same document.
+"""
+
+import argparse
+import logging
+import shutil
+from pathlib import Path
+
+import faiss
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+STORE_NAMES = ['vedas_index', 'wellness_index', 'educational_index', 'unified_index']
+
+# HNSW build parameters
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
+# IVF-PQ build parameters (48 sub-quantizers of 8 bits for 384-dim vectors)
+IVF_NLIST = 256
+PQ_M = 48
+PQ_NBITS = 8
+MIN_POINTS_PER_CENTROID = 39
+
+
+def build_hnsw_index(vectors, metric: int) -> faiss.Index:
+    """
+    Build an HNSW index over the given vectors
+
+    Args:
+        vectors: float32 array of shape (n, d)
+        metric: FAISS metric type of the source index
+
+    Returns:
+        Populated IndexHNSWFlat
+    """
+    index = faiss.IndexHNSWFlat(vectors.shape[1], HNSW_M, metric)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.add(vectors)
+    return index
+
+
+def build_ivfpq_index(vectors, metric: int) -> faiss.Index:
+    """
+    Train and build an IVF-PQ index over the given vectors
+
+    Args:
+        vectors: float32 array of shape (n, d)
+        metric: FAISS metric type of the source index
+
+    Returns:
+        Trained and populated IndexIVFPQ
+    """
+    dim = vectors.shape[1]
+    nlist = max(1, min(IVF_NLIST, len(vectors) // MIN_POINTS_PER_CENTROID))
+    quantizer = faiss.IndexFlatIP(dim) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dim)
+    index = faiss.IndexIVFPQ(quantizer, dim, nlist, PQ_M, PQ_NBITS, metric)
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def migrate_store(store_path: Path, index_type: str = "hnsw", backup: bool = True) -> bool:
+    """
+    Replace a store's flat index.faiss with an HNSW or IVF-PQ index
+
+    Args:
+        store_path: Directory holding index.faiss and index.pkl
+        index_type: 'hnsw' or 'ivfpq'
+        backup: Keep the original flat index as index.faiss.flat
+
+    Returns:
+        True if the store was migrated
+    """
+    index_file = store_path / "index.faiss"
+    if not index_file.exists():
+        logger.warning(f"No index found at {index_file}")
+        return False
+
+    index = faiss.read_index(str(index_file))
+    if not isinstance(index, faiss.IndexFlat):
+        logger.info(f"{store_path.name} is already a {type(index).__name__}, skipping")
+        return False
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    logger.info(f"Rebuilding {store_path.name} ({index.ntotal} vectors) as {index_type}")
+
+    if index_type == "hnsw":
+        new_index = build_hnsw_index(vectors, index.metric_type)
+    elif index_type == "ivfpq":
+        new_index = build_ivfpq_index(vectors, index.metric_type)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    if backup:
+        shutil.copy2(index_file, store_path / "index.faiss.flat")
+    faiss.write_index(new_index, str(index_file))
+    logger.info(f"Migrated {store_path.name}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild flat FAISS vector stores as HNSW or IVF-PQ")
+    parser.add_argument("--vector-store-dir", type=str, default="vector_stores", help="Vector store directory (default: vector_stores)")
+    parser.add_argument("--index-type", choices=["hnsw", "ivfpq"], default="hnsw", help="Target index type (default: hnsw)")
+    parser.add_argument("--no-backup", action="store_true", help="Do not keep the original flat index")
+    args = parser.parse_args()
+
+    vector_store_dir = Path(args.vector_store_dir)
+    migrated = 0
+    for store_name in STORE_NAMES:
+        if migrate_store(vector_store_dir / store_name, args.index_type, backup=not args.no_backup):
+            migrated += 1
+
+    logger.info(f"Migrated {migrated} of {len(STORE_NAMES)} vector stores")
+
+
+if __name__ == "__main__":
+    main()
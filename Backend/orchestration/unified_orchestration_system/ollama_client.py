@@ -4,16 +4,27 @@ Ollama Client for Local LLM Integration
 Provides a simple interface to interact with Ollama models for wellness responses
 """
 
+import asyncio
 import requests
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    logger.warning("httpx not available - async Ollama calls will run in a worker thread")
+
+class OllamaStreamError(Exception):
+    """Raised when an Ollama stream stops after yielding tokens but before reporting done"""
+
 class OllamaClient:
     """Client for interacting with Ollama local LLM models"""
     
@@ -28,6 +39,7 @@ class OllamaClient:
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = 60  # 60 seconds timeout
+        self._async_client = None
         
         # Test connection on initialization
         self._test_connection()
@@ -78,21 +90,94 @@ class OllamaClient:
             response_time = time.time() - start_time
             
             if response:
-                return {
-                    "success": True,
-                    "response": response,
-                    "model": self.model,
-                    "response_time": round(response_time, 2),
-                    "source": "ollama_local",
-                    "timestamp": time.time()
-                }
+                return self._get_success_response(response, response_time)
             else:
                 return self._get_fallback_response(query)
                 
         except Exception as e:
             logger.error(f"Error generating wellness response: {e}")
             return self._get_fallback_response(query)
+
+    async def agenerate_wellness_response(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Async variant of generate_wellness_response that does not block the event loop
+
+        Args:
+            query: User's wellness query
+            user_context: Optional context (mood_score, stress_level, etc.)
+
+        Returns:
+            Dict containing response and metadata
+        """
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.generate_wellness_response, query, user_context)
+
+        try:
+            prompt = self._build_wellness_prompt(query, user_context)
+
+            start_time = time.time()
+            response = await self._amake_ollama_request(prompt)
+            response_time = time.time() - start_time
+
+            if response:
+                return self._get_success_response(response, response_time)
+            else:
+                return self._get_fallback_response(query)
+
+        except Exception as e:
+            logger.error(f"Error generating wellness response: {e}")
+            return self._get_fallback_response(query)
     
+    async def astream_wellness_response(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        Stream a wellness response token by token
+
+        Args:
+            query: User's wellness query
+            user_context: Optional context (mood_score, stress_level, etc.)
+
+        Yields:
+            Generated text chunks; nothing if Ollama is unavailable
+
+        Raises:
+            OllamaStreamError: If the stream fails or ends early after text was yielded
+        """
+        prompt = self._build_wellness_prompt(query, user_context)
+
+        if not HTTPX_AVAILABLE:
+            response = await asyncio.to_thread(self._make_ollama_request, prompt)
+            if response:
+                yield response
+            return
+
+        payload = self._build_payload(prompt)
+        payload["stream"] = True
+
+        streamed = False
+        try:
+            logger.info(f"🤖 Streaming request to Ollama model: {self.model}")
+            async with self._get_async_client().stream("POST", "/api/generate", json=payload) as response:
+                if response.status_code != 200:
+                    logger.error(f"❌ Ollama API error: {response.status_code}")
+                    return
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('response'):
+                        streamed = True
+                        yield chunk['response']
+                    if chunk.get('done'):
+                        return
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            logger.error(f"❌ Ollama streaming error: {e}")
+            if streamed:
+                raise OllamaStreamError(str(e)) from e
+            return
+
+        if streamed:
+            raise OllamaStreamError("stream ended before Ollama reported done")
+
     def _build_wellness_prompt(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> str:
         """Build a comprehensive wellness prompt"""
         
@@ -125,19 +210,23 @@ Guidelines for your responses:
         
         return base_prompt
     
+    def _build_payload(self, prompt: str) -> Dict[str, Any]:
+        """Build the /api/generate request body"""
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_tokens": 500
+            }
+        }
+
     def _make_ollama_request(self, prompt: str) -> Optional[str]:
         """Make a request to Ollama API"""
         try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 500
-                }
-            }
+            payload = self._build_payload(prompt)
             
             logger.info(f"🤖 Sending request to Ollama model: {self.model}")
             
@@ -171,6 +260,63 @@ Guidelines for your responses:
             logger.error(f"❌ Error making Ollama request: {e}")
             return None
     
+    def _get_async_client(self) -> "httpx.AsyncClient":
+        """Return the shared keep-alive async HTTP client, creating it on first use"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0),
+                timeout=httpx.Timeout(self.timeout, connect=10.0)
+            )
+        return self._async_client
+
+    async def _amake_ollama_request(self, prompt: str) -> Optional[str]:
+        """Make a non-blocking request to Ollama API over a pooled connection"""
+        try:
+            logger.info(f"🤖 Sending async request to Ollama model: {self.model}")
+
+            response = await self._get_async_client().post("/api/generate", json=self._build_payload(prompt))
+
+            if response.status_code == 200:
+                generated_text = response.json().get('response', '').strip()
+
+                if generated_text:
+                    logger.info(f"✅ Ollama response generated successfully ({len(generated_text)} chars)")
+                    return generated_text
+                else:
+                    logger.warning("⚠️  Ollama returned empty response")
+                    return None
+            else:
+                logger.error(f"❌ Ollama API error: {response.status_code} - {response.text}")
+                return None
+
+        except httpx.TimeoutException:
+            logger.error("❌ Ollama request timed out")
+            return None
+        except httpx.ConnectError:
+            logger.error("❌ Cannot connect to Ollama server")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error making Ollama request: {e}")
+            return None
+
+    async def aclose(self):
+        """Close the pooled async HTTP client"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _get_success_response(self, response: str, response_time: float) -> Dict[str, Any]:
+        """Wrap a generated response with its metadata"""
+        return {
+            "success": True,
+            "response": response,
+            "model": self.model,
+            "response_time": round(response_time, 2),
+            "source": "ollama_local",
+            "timestamp": time.time()
+        }
+
     def _get_fallback_response(self, query: str) -> Dict[str, Any]:
         """Return a fallback response when Ollama fails"""
         fallback_text = f"Thank you for reaching out about '{query}'. I'm currently experiencing technical difficulties with my AI system, but I want to help. Here are some general wellness suggestions: Take time for self-care, practice deep breathing, stay connected with supportive people, and remember that small steps can lead to big improvements. If you're experiencing serious concerns, please consider speaking with a healthcare professional."
@@ -7,14 +7,23 @@ Tests if the forecasting system is working correctly
 import requests
 import json
 import sys
+import importlib.util
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+
+# Shared session so the status probe and forecast request reuse one keep-alive connection
+SESSION = requests.Session()
+SESSION.headers.update({'Content-Type': 'application/json'})
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
 
 def test_backend_status():
     """Test if the backend is running and forecasting is enabled"""
     print("🔍 Testing Backend Status...")
     
     try:
-        response = requests.get('http://localhost:8002/forecast/status', timeout=5)
+        response = SESSION.get('http://localhost:8002/forecast/status', timeout=5)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Backend is running!")
@@ -34,19 +43,16 @@ def test_forecast_api():
     print("\n📊 Testing Forecast API...")
     
     # Generate sample data
-    sample_data = []
     start_date = datetime.now() - timedelta(days=30)
+    dates = pd.date_range(start=start_date, periods=30, freq='D').strftime("%Y-%m-%d").tolist()
+    
+    i = np.arange(30)
+    values = np.round(100 + 20 * (i / 30) + (i % 7) * 5, 2).tolist()  # Simple trend with weekly pattern
     
-    for i in range(30):
-        date = start_date + timedelta(days=i)
-        value = 100 + 20 * (i / 30) + (i % 7) * 5  # Simple trend with weekly pattern
-        sample_data.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "value": round(value, 2)
-        })
+    sample_data = [{"date": date, "value": value} for date, value in zip(dates, values)]
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             'http://localhost:8002/forecast',
             json={
                 "data": sample_data,
@@ -87,26 +93,19 @@ def test_dependencies():
     """Test if required dependencies are installed"""
     print("\n📦 Testing Dependencies...")
     
-    try:
-        import prophet
-        print("✅ Prophet installed")
-    except ImportError:
-        print("❌ Prophet not installed - run: pip install prophet")
-        return False
+    # find_spec only locates the package; importing Prophet would initialize cmdstanpy
+    dependencies = [
+        ('prophet', 'Prophet', 'prophet'),
+        ('statsmodels', 'Statsmodels', 'statsmodels'),
+        ('sklearn', 'Scikit-learn', 'scikit-learn')
+    ]
     
-    try:
-        import statsmodels
-        print("✅ Statsmodels installed")
-    except ImportError:
-        print("❌ Statsmodels not installed - run: pip install statsmodels")
-        return False
-    
-    try:
-        import sklearn
-        print("✅ Scikit-learn installed")
-    except ImportError:
-        print("❌ Scikit-learn not installed - run: pip install scikit-learn")
-        return False
+    for module_name, display_name, package_name in dependencies:
+        if importlib.util.find_spec(module_name) is not None:
+            print(f"✅ {display_name} installed")
+        else:
+            print(f"❌ {display_name} not installed - run: pip install {package_name}")
+            return False
     
     return True
 
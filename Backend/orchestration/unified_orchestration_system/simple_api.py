@@ -4,16 +4,29 @@ Each endpoint has both GET and POST methods for frontend integration
 """
 
 import os
+import re
+import time
+import hashlib
+import asyncio
+import importlib.util
+import functools
 import uuid
+import dataclasses
 import logging
+import orjson
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Callable
 from pathlib import Path
 
+import numpy as np
+import faiss
+
 # FastAPI imports
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from contextlib import asynccontextmanager
 
 # Environment and AI imports
@@ -26,6 +39,8 @@ from langchain_community.vectorstores import FAISS
 
 # Local LLM imports
 from ollama_client import OllamaClient
+from fast_embeddings import FastMiniLM
+from migrate_vector_stores import HNSW_M
 
 # Load environment variables
 load_dotenv()
@@ -33,20 +48,118 @@ load_dotenv()
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("ENGINE_LOG_LEVEL", "INFO").upper())
 
-# Advanced Forecasting imports (after logger setup)
+# Advanced Forecasting imports (after logger setup). Prophet and statsmodels are
+# only checked for here; the selector imports them when a forecast is requested
 try:
     from smart_model_selector import SmartModelSelector
-    from enhanced_prophet_model import EnhancedProphetModel
-    from enhanced_arima_model import EnhancedARIMAModel
     from model_performance_evaluator import ModelPerformanceEvaluator
+    for forecasting_package in ("prophet", "statsmodels"):
+        if importlib.util.find_spec(forecasting_package) is None:
+            raise ImportError(f"No module named '{forecasting_package}'")
     FORECASTING_AVAILABLE = True
     logger.info("Advanced forecasting models loaded successfully")
 except ImportError as e:
     FORECASTING_AVAILABLE = False
-    logger.warning(f"Advanced forecasting not available: {e}")
+    logger.warning("Advanced forecasting not available: %s", e)
     logger.info("Install required packages: pip install prophet statsmodels scikit-learn")
 
+# Prompt and fallback templates, filled per request with str.format_map
+VEDAS_PROMPT = """You are a wise spiritual teacher. Based on ancient Vedic wisdom, provide profound guidance for this question: "{query}"
+
+Context from sacred texts:
+{context}
+
+Provide spiritual wisdom that is authentic, practical, and inspiring. Keep it concise but meaningful."""
+
+VEDAS_FALLBACK = "The ancient Vedic texts teach us to seek truth through self-reflection and righteous action. Regarding '{query}', remember that true wisdom comes from understanding the interconnectedness of all existence. Practice mindfulness, act with compassion, and seek the divine within yourself."
+
+EDUMENTOR_PROMPT = """You are an expert educator. Explain this topic clearly and engagingly: "{query}"
+
+Educational context:
+{context}
+
+Provide a clear, comprehensive explanation that:
+- Uses simple, understandable language
+- Includes practical examples
+- Makes the topic interesting and memorable
+- Is suitable for students"""
+
+EDUMENTOR_FALLBACK = "Great question about '{query}'! This is an important topic to understand. Let me break it down for you in simple terms with practical examples that will help you learn and remember the key concepts. The main idea is to understand the fundamental principles and how they apply in real-world situations."
+
+WELLNESS_GEMINI_PROMPT = """You are a compassionate wellness counselor. Provide caring, helpful advice for: "{query}"
+
+Provide supportive guidance that:
+- Shows empathy and understanding
+- Offers practical, actionable advice
+- Promotes overall wellbeing
+- Is encouraging and positive"""
+
+WELLNESS_FALLBACK = "Thank you for reaching out about '{query}'. It's important to take care of your wellbeing. Here are some gentle suggestions: Take time for self-care, practice deep breathing, stay connected with supportive people, and remember that small steps can lead to big improvements. If you're experiencing serious concerns, please consider speaking with a healthcare professional."
+
+# Rule-based wellness responses for bare keyword queries such as "stressed" or
+# "I'm so anxious". Anything beyond the keyword and a few filler words, and any
+# query that mentions crisis terms, goes to the LLM.
+WELLNESS_CRISIS_PATTERN = re.compile(
+    r"\b(suicid\w*|kill(ing)? myself|self[- ]harm|hurt(ing)? myself|end(ing)? (my|it all)|"
+    r"die|dying|dead|tired of (living|life)|sleep forever|never wake up|overdos\w*|"
+    r"disappear\w*|abuse\w*|emergency)\b", re.I
+)
+WELLNESS_FILLER_WORDS = frozenset({
+    "i", "i'm", "im", "am", "feel", "feeling", "so", "very", "really", "too",
+    "a", "bit", "little", "lot", "quite", "kind", "of", "just", "today", "lately",
+    "always", "and", "help", "please", "me",
+})
+WELLNESS_WORD_PATTERN = re.compile(r"[a-z']+")
+WELLNESS_RULE_MAX_WORDS = 12
+WELLNESS_RULE_LOG_EVERY = 100
+WELLNESS_PATTERNS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\b(stressed|stress|stressful|overwhelmed)\b", re.I),
+     "Feeling stressed is a natural response to pressure, and it helps to give your body a chance to reset. Try a few minutes of slow breathing: in for four counts, hold for four, out for six. Break what is in front of you into small, concrete steps and focus on just the next one. Short walks, regular meals and time away from screens all lower stress over the day. If stress stays high for weeks or affects your sleep and health, consider talking with a counselor or healthcare professional."),
+    (re.compile(r"\b(anxious|anxiety|nervous|worried|panic\w*)\b", re.I),
+     "Anxiety can feel intense, but it does pass. Ground yourself by naming five things you can see, four you can hear and three you can touch, and let your breathing slow with a longer exhale. Gently question anxious thoughts: what is actually likely to happen, and what could you do if it did? Regular movement, limiting caffeine and talking with someone you trust can all help. If anxiety is frequent or disrupts daily life, a mental health professional can offer effective support."),
+    (re.compile(r"\b(sleep|insomnia|can'?t sleep|sleepless)\b", re.I),
+     "Good sleep starts with a steady routine: go to bed and wake up at the same times each day, even on weekends. Keep the hour before bed calm and screen-free, and make your room cool, dark and quiet. Avoid caffeine after midday and heavy meals late in the evening. If you cannot fall asleep within about 20 minutes, get up and do something relaxing until you feel sleepy. If sleep problems continue for several weeks, it is worth speaking with a healthcare professional."),
+    (re.compile(r"\b(tired|exhausted|fatigue|fatigued|burn(ed|t)? ?out)\b", re.I),
+     "Ongoing tiredness is often your body asking for rest and balance. Protect regular sleep, drink enough water and eat regular, nourishing meals. Short breaks during the day and a little gentle movement can restore energy better than pushing through. Look at what is draining you and whether any commitments can be reduced or shared. If exhaustion persists despite rest, please check in with a healthcare professional to rule out underlying causes."),
+]
+
+# Response cache settings
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 3600  # seconds
+SEMANTIC_CACHE_THRESHOLD = 0.95
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+EMBEDDING_CACHE_SIZE = 2048
+
+# Fitted forecasting models kept per (metric_type, series digest)
+FORECAST_MODEL_CACHE_SIZE = 32
+
+# LLM racing: start Gemini alongside a slow Ollama instead of only after it fails
+RACE_LLMS = os.getenv("RACE_LLMS", "false").lower() in ("1", "true", "yes")
+LLM_RACE_GRACE = float(os.getenv("LLM_RACE_GRACE", "2.0"))  # seconds Ollama gets to itself
+OLLAMA_HEALTH_TTL = 5.0  # seconds a failed Ollama call skips the grace period
+
+# Gemini circuit breaker: after GEMINI_FAILURE_THRESHOLD failures within
+# GEMINI_FAILURE_WINDOW seconds, skip Gemini for GEMINI_COOLDOWN seconds
+GEMINI_FAILURE_THRESHOLD = 3
+GEMINI_FAILURE_WINDOW = 60.0
+GEMINI_COOLDOWN = 30.0
+
+# Search-time parameters for vector stores rebuilt by migrate_vector_stores.py
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 16
+
+# Characters of each retrieved document returned as source text
+SOURCE_PREVIEW_CHARS = 500
+
+# Stores merged into one globally ranked index for /edumentor
+MERGED_STORE_TYPES = ['vedas', 'educational']
+
+# LLM micro-batching: prompts arriving within the window are dispatched together
+LLM_BATCH_WINDOW = float(os.getenv("LLM_BATCH_WINDOW_MS", "20")) / 1000.0
+LLM_MAX_BATCH = int(os.getenv("LLM_MAX_BATCH", "8"))
+
 class SimpleOrchestrationEngine:
     """Simple orchestration engine for the three main endpoints"""
     
@@ -56,10 +169,68 @@ class SimpleOrchestrationEngine:
         self.gemini_model = None
         self.ollama_client = None
         self.forecasting_enabled = FORECASTING_AVAILABLE
+        self._ollama_healthy = True
+        self._ollama_checked_at = 0.0
+        self._forecast_model_cache: OrderedDict = OrderedDict()
+
+        # Merged vedas + educational index; global id = (store tag << 32) | local id
+        self._merged_index: Optional[faiss.IndexIDMap2] = None
+        self._id_to_doc: Dict[int, Any] = {}
+
+        # Rule-based wellness responder hit rate
+        self.wellness_rule_requests = 0
+        self.wellness_rule_hits = 0
+
+        # Two-tier response cache: exact match on the normalized query, then
+        # nearest previously-seen query by cosine similarity
+        self.exact_cache: OrderedDict = OrderedDict()
+        self.semantic_indexes: Dict[str, faiss.IndexIDMap2] = {}
+        self.semantic_payloads: OrderedDict = OrderedDict()
+        self._semantic_next_id = 0
+
+        # Query embeddings keyed by normalized query, shared by retrieval and the semantic cache
+        self._embedding_cache = functools.lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(self._embed_uncached)
+
+        # Pending (prompt, fallback, future) entries for the LLM micro-batcher
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Second-resolution wall clock refreshed by a background task
+        self._now = datetime.now().isoformat(timespec="seconds")
+        self._clock_task: Optional[asyncio.Task] = None
+
         self.initialize_llms()
         if self.forecasting_enabled:
             self.initialize_forecasting()
 
+    @property
+    def timestamp(self) -> str:
+        """Current ISO timestamp (second resolution) for responses"""
+        if self._clock_task is None:
+            return datetime.now().isoformat(timespec="seconds")
+        return self._now
+
+    async def _tick_clock(self):
+        """Refresh the cached timestamp once per second"""
+        while True:
+            self._now = datetime.now().isoformat(timespec="seconds")
+            await asyncio.sleep(1.0)
+
+    def start_clock(self):
+        """Start the background timestamp task on the running event loop"""
+        if self._clock_task is None:
+            self._clock_task = asyncio.create_task(self._tick_clock())
+
+    async def stop_clock(self):
+        """Cancel the background timestamp task"""
+        if self._clock_task is not None:
+            self._clock_task.cancel()
+            try:
+                await self._clock_task
+            except asyncio.CancelledError:
+                pass
+            self._clock_task = None
+
     def initialize_llms(self):
         """Initialize both Ollama (primary) and Gemini (fallback) LLMs"""
 
@@ -68,70 +239,155 @@ class SimpleOrchestrationEngine:
             self.ollama_client = OllamaClient(model="llama3.2:3b")
             logger.info("✅ Ollama client initialized successfully")
         except Exception as e:
-            logger.warning(f"⚠️  Ollama initialization failed: {e}")
+            logger.warning("⚠️  Ollama initialization failed: %s", e)
             self.ollama_client = None
 
         # Initialize Gemini as fallback
         self.initialize_gemini()
 
     def initialize_gemini(self):
-        """Initialize Gemini API with failover"""
-        primary_key = os.getenv("GEMINI_API_KEY")
-        backup_key = os.getenv("GEMINI_API_KEY_BACKUP")
-        
-        # Try primary key
-        if primary_key:
-            try:
-                genai.configure(api_key=primary_key)
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-                test_response = self.gemini_model.generate_content("Hello")
-                if test_response and test_response.text:
-                    logger.info("Gemini API initialized with primary key")
-                    return
-            except Exception as e:
-                logger.warning(f"Primary Gemini API key failed: {e}")
-        
-        # Try backup key
-        if backup_key:
-            try:
-                genai.configure(api_key=backup_key)
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-                test_response = self.gemini_model.generate_content("Hello")
-                if test_response and test_response.text:
-                    logger.info("Gemini API initialized with backup key")
-                    return
-            except Exception as e:
-                logger.warning(f"Backup Gemini API key failed: {e}")
-        
-        logger.error("Both Gemini API keys failed. Using fallback responses.")
-        self.gemini_model = None
+        """
+        Configure Gemini with the primary key (or the backup if there is none)
+
+        No test request is made; the first real request shows whether the key
+        works, and _generate_with_gemini rotates to the backup key on failure.
+        """
+        self._gemini_keys = [key for key in (os.getenv("GEMINI_API_KEY"), os.getenv("GEMINI_API_KEY_BACKUP")) if key]
+        self._gemini_key_index = 0
+        self._gemini_healthy = True
+        self._gemini_failures: deque = deque()
+        self._gemini_open_until = 0.0
+
+        if not self._gemini_keys:
+            logger.error("No Gemini API keys configured. Using fallback responses.")
+            self.gemini_model = None
+            return
+
+        try:
+            self._configure_gemini_key(0)
+            logger.info("Gemini API configured (key verified on first request)")
+        except Exception as e:
+            logger.error("Gemini API configuration failed: %s", e)
+            self.gemini_model = None
+
+    def _configure_gemini_key(self, key_index: int):
+        """Point the Gemini client at one of the configured API keys"""
+        genai.configure(api_key=self._gemini_keys[key_index])
+        self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+        self._gemini_key_index = key_index
+
+    def _record_gemini_failure(self):
+        """Rotate to the backup key, and open the circuit after repeated failures"""
+        now = time.monotonic()
+        self._gemini_failures.append(now)
+        while self._gemini_failures and now - self._gemini_failures[0] > GEMINI_FAILURE_WINDOW:
+            self._gemini_failures.popleft()
+
+        if self._gemini_key_index + 1 < len(self._gemini_keys):
+            logger.warning("gemini key %d failed, switching to backup key", self._gemini_key_index)
+            self._configure_gemini_key(self._gemini_key_index + 1)
+
+        if len(self._gemini_failures) >= GEMINI_FAILURE_THRESHOLD:
+            logger.warning("gemini circuit open for %.0fs", GEMINI_COOLDOWN)
+            self._gemini_healthy = False
+            self._gemini_open_until = now + GEMINI_COOLDOWN
+            self._gemini_failures.clear()
     
-    def initialize_vector_stores(self):
+    async def initialize_vector_stores(self):
         """Initialize vector stores and embedding model"""
         logger.info("Initializing embedding model...")
-        self.embedding_model = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        try:
+            self.embedding_model = FastMiniLM(backend=os.getenv("EMBEDDING_BACKEND", "auto"))
+        except Exception as e:
+            logger.warning("Fast embedding backend unavailable, using HuggingFaceEmbeddings: %s", e)
+            self.embedding_model = HuggingFaceEmbeddings(
+                model_name="sentence-transformers/all-MiniLM-L6-v2"
+            )
         
-        # Load existing vector stores
+        # Load existing vector stores concurrently; unpickling and
+        # faiss.read_index are I/O and C calls, so threads overlap well
         vector_store_dir = Path("vector_stores")
         store_names = ['vedas_index', 'wellness_index', 'educational_index', 'unified_index']
+        store_names = [name for name in store_names if (vector_store_dir / name).exists()]
+
+        results = await asyncio.gather(
+            *[asyncio.to_thread(self._load_vector_store, vector_store_dir / name) for name in store_names],
+            return_exceptions=True
+        )
+
+        for store_name, result in zip(store_names, results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to load vector store %s: %s", store_name, result)
+            else:
+                self.vector_stores[store_name.replace('_index', '')] = result
+                logger.info("Loaded vector store: %s", store_name)
         
-        for store_name in store_names:
-            store_path = vector_store_dir / store_name
-            if store_path.exists():
-                try:
-                    store = FAISS.load_local(
-                        str(store_path), 
-                        self.embedding_model, 
-                        allow_dangerous_deserialization=True
-                    )
-                    self.vector_stores[store_name.replace('_index', '')] = store
-                    logger.info(f"Loaded vector store: {store_name}")
-                except Exception as e:
-                    logger.error(f"Failed to load vector store {store_name}: {e}")
-        
-        logger.info(f"Initialized with {len(self.vector_stores)} vector stores")
+        logger.info("Initialized with %d vector stores", len(self.vector_stores))
+
+        try:
+            await asyncio.to_thread(self._build_merged_index, MERGED_STORE_TYPES)
+        except Exception as e:
+            logger.error("Failed to build merged index: %s", e)
+
+    def _build_merged_index(self, store_types: List[str]):
+        """
+        Merge several vector stores into one index searched with a single call
+
+        Vectors are copied out of each store's index and tagged with the store's
+        position in store_types, so hits can be mapped back to their documents.
+        The merged index matches the stores' metric and uses HNSW if they do.
+        """
+        stores = [(tag, self.vector_stores[st]) for tag, st in enumerate(store_types) if st in self.vector_stores]
+        if len(stores) < 2:
+            return
+
+        indexes = [store.index for _, store in stores]
+        metric = indexes[0].metric_type
+        if any(index.metric_type != metric for index in indexes):
+            logger.warning("Vector stores use different metrics, not merging")
+            return
+
+        dim = indexes[0].d
+        if any(hasattr(index, "hnsw") for index in indexes):
+            base = faiss.IndexHNSWFlat(dim, HNSW_M, metric)
+        else:
+            base = faiss.IndexFlat(dim, metric)
+        merged = faiss.IndexIDMap2(base)
+
+        id_to_doc = {}
+        for tag, store in stores:
+            vectors = store.index.reconstruct_n(0, store.index.ntotal)
+            local_ids = np.arange(store.index.ntotal, dtype=np.int64)
+            merged.add_with_ids(vectors, (tag << 32) | local_ids)
+            for local_id, doc_id in store.index_to_docstore_id.items():
+                id_to_doc[(tag << 32) | local_id] = store.docstore.search(doc_id)
+
+        self._tune_index(base)
+        self._merged_index = merged
+        self._id_to_doc = id_to_doc
+        logger.info("Merged %d vector stores into one index (%d vectors)", len(stores), merged.ntotal)
+
+    def _load_vector_store(self, store_path: Path) -> FAISS:
+        """Load one FAISS vector store and apply search-time tuning"""
+        store = FAISS.load_local(
+            str(store_path), 
+            self.embedding_model, 
+            allow_dangerous_deserialization=True
+        )
+        self._tune_index(store.index)
+
+        # Documents are immutable once loaded, so slice each preview once
+        for doc in store.docstore._dict.values():
+            doc.metadata["_preview"] = doc.page_content[:SOURCE_PREVIEW_CHARS]
+        return store
+
+    @staticmethod
+    def _tune_index(index):
+        """Set search-time parameters on HNSW / IVF indexes (flat indexes need none)"""
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif hasattr(index, "nprobe"):
+            index.nprobe = IVF_NPROBE
 
     def initialize_forecasting(self):
         """Initialize forecasting capabilities"""
@@ -145,7 +401,7 @@ class SimpleOrchestrationEngine:
             self.performance_evaluator = ModelPerformanceEvaluator()
             logger.info("✅ Advanced forecasting capabilities initialized")
         except Exception as e:
-            logger.error(f"Failed to initialize forecasting: {e}")
+            logger.error("Failed to initialize forecasting: %s", e)
             self.forecasting_enabled = False
 
     def generate_forecast(self, data: list, metric_type: str = "general",
@@ -171,149 +427,535 @@ class SimpleOrchestrationEngine:
         try:
             # Convert data to DataFrame format
             import pandas as pd
-            df_data = []
-            for point in data:
-                df_data.append({
-                    'ds': point.get('date'),
-                    'y': point.get('value')
-                })
-
-            df = pd.DataFrame(df_data)
-
-            # Use smart model selector
-            selector = SmartModelSelector(metric_type)
-            selection_result = selector.select_best_model(df)
-
-            if selection_result['selected_model'] in ['prophet', 'arima']:
-                model = selection_result['model_object']
+            df = pd.DataFrame({
+                'ds': pd.to_datetime([point.get('date') for point in data]),
+                'y': np.asarray([point.get('value') for point in data], dtype=np.float64)
+            })
+
+            # Model selection and fitting are deterministic in the series, so
+            # reuse a fitted selection for repeat forecasts of the same data
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(df['ds'].to_numpy(dtype='datetime64[ns]').tobytes())
+            digest.update(df['y'].to_numpy().tobytes())
+            cache_key = (metric_type, digest.hexdigest())
+
+            selection_result = self._forecast_model_cache.get(cache_key)
+            if selection_result is not None:
+                self._forecast_model_cache.move_to_end(cache_key)
+                selection_result = dataclasses.replace(selection_result, timestamp=datetime.now().isoformat())
+                logger.info("forecast model cache hit %s %s", selection_result.selected_model, metric_type)
+            else:
+                # Use smart model selector
+                selector = SmartModelSelector(metric_type)
+                selection_result = selector.select_best_model(df)
+                # Fallbacks may come from transient failures, so only fitted models are kept
+                if selection_result.selected_model in ('prophet', 'arima'):
+                    self._forecast_model_cache[cache_key] = selection_result
+                    while len(self._forecast_model_cache) > FORECAST_MODEL_CACHE_SIZE:
+                        self._forecast_model_cache.popitem(last=False)
+
+            if selection_result.selected_model in ['prophet', 'arima']:
+                model = selection_result.model_object
                 forecast_df = model.predict(periods=forecast_periods)
 
-                # Convert forecast to list format
-                forecast_data = []
-                for _, row in forecast_df.iterrows():
-                    forecast_data.append({
-                        "date": row['ds'].isoformat(),
-                        "predicted_value": float(row['yhat']),
-                        "lower_bound": float(row.get('yhat_lower', 0)),
-                        "upper_bound": float(row.get('yhat_upper', 0))
-                    })
+                # Convert forecast to list format column by column
+                zeros = np.zeros(len(forecast_df))
+                predicted = forecast_df['yhat'].to_numpy(dtype=np.float64).tolist()
+                lower = (forecast_df['yhat_lower'].to_numpy(dtype=np.float64) if 'yhat_lower' in forecast_df else zeros).tolist()
+                upper = (forecast_df['yhat_upper'].to_numpy(dtype=np.float64) if 'yhat_upper' in forecast_df else zeros).tolist()
+                forecast_data = [
+                    {
+                        "date": ds.isoformat(),
+                        "predicted_value": yhat,
+                        "lower_bound": yhat_lower,
+                        "upper_bound": yhat_upper
+                    }
+                    for ds, yhat, yhat_lower, yhat_upper in zip(forecast_df['ds'], predicted, lower, upper)
+                ]
 
                 return {
                     "status": "success",
-                    "model_used": selection_result['selected_model'],
+                    "model_used": selection_result.selected_model,
                     "forecast_data": forecast_data,
-                    "selection_reason": selection_result['selection_reason'],
-                    "confidence": selection_result.get('confidence', 'medium')
+                    "selection_reason": selection_result.selection_reason,
+                    "confidence": selection_result.confidence
                 }
             else:
                 return {
                     "status": "fallback",
                     "message": "Using simple forecast method",
-                    "selection_reason": selection_result['selection_reason']
+                    "selection_reason": selection_result.selection_reason
                 }
 
         except Exception as e:
-            logger.error(f"Forecast generation failed: {e}")
+            logger.error("Forecast generation failed: %s", e)
             return {
                 "status": "error",
                 "message": f"Forecast generation failed: {str(e)}"
             }
 
-    def generate_response(self, prompt: str, fallback: str) -> str:
+    async def generate_response(self, prompt: str, fallback: str) -> str:
         """Generate response using Ollama (primary) and Gemini (fallback)"""
-
-        # Try Ollama first (local LLM)
-        if self.ollama_client:
-            try:
-                result = self.ollama_client.generate_wellness_response(prompt)
-                if result.get('success') and result.get('response'):
-                    logger.info(f"✅ Response generated using Ollama ({result.get('response_time', 0)}s)")
-                    return result['response']
-                else:
-                    logger.warning("⚠️  Ollama failed to generate response")
-            except Exception as e:
-                logger.warning(f"Ollama error: {e}")
-
-        # Fallback to Gemini
-        if self.gemini_model:
-            try:
-                response = self.gemini_model.generate_content(prompt)
-                if response and response.text:
-                    logger.info("✅ Response generated using Gemini (fallback)")
-                    return response.text.strip()
-            except Exception as e:
-                logger.warning(f"Gemini API error: {e}")
+        text = await self._generate_llm_text(prompt, None, prompt)
+        if text:
+            return text
 
         # Final fallback to hardcoded response
-        logger.warning("⚠️  Both Ollama and Gemini failed, using hardcoded fallback")
+        logger.warning("all LLMs failed, using hardcoded fallback")
         return fallback
 
-    def generate_wellness_response(self, query: str, user_context: Optional[Dict[str, Any]] = None, fallback: str = "") -> str:
-        """Generate wellness response with user context using Ollama (primary) and Gemini (fallback)"""
+    async def generate_response_batched(self, prompt: str, fallback: str) -> str:
+        """
+        Queue a prompt for the next micro-batch and wait for its response
 
-        # Try Ollama first with user context
-        if self.ollama_client:
-            try:
-                result = self.ollama_client.generate_wellness_response(query, user_context)
-                if result.get('success') and result.get('response'):
-                    logger.info(f"✅ Wellness response generated using Ollama ({result.get('response_time', 0)}s)")
-                    return result['response']
-                else:
-                    logger.warning("⚠️  Ollama failed to generate wellness response")
-            except Exception as e:
-                logger.warning(f"Ollama wellness error: {e}")
+        Prompts arriving within LLM_BATCH_WINDOW are dispatched together (up to
+        LLM_MAX_BATCH at once) and identical prompts share a single generation.
 
-        # Fallback to Gemini with basic prompt
-        if self.gemini_model:
-            try:
-                prompt = f"""You are a compassionate wellness counselor. Provide caring, helpful advice for: "{query}"
+        Args:
+            prompt: Full LLM prompt
+            fallback: Response to use when every LLM fails
 
-Provide supportive guidance that:
-- Shows empathy and understanding
-- Offers practical, actionable advice
-- Promotes overall wellbeing
-- Is encouraging and positive"""
+        Returns:
+            Generated (or fallback) response text
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prompt, fallback, future))
+
+        if len(self._pending) >= LLM_MAX_BATCH:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(LLM_BATCH_WINDOW, self._flush_pending)
+
+        return await future
+
+    def _flush_pending(self):
+        """Dispatch up to LLM_MAX_BATCH queued prompts"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch = self._pending[:LLM_MAX_BATCH]
+        self._pending = self._pending[LLM_MAX_BATCH:]
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self._flush_pending)
+        if batch:
+            asyncio.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        """Generate responses for one micro-batch concurrently"""
+        grouped: Dict[str, Tuple[str, List[asyncio.Future]]] = {}
+        for prompt, fallback, future in batch:
+            grouped.setdefault(prompt, (fallback, []))[1].append(future)
+
+        results = await asyncio.gather(
+            *[self.generate_response(prompt, fallback) for prompt, (fallback, _) in grouped.items()],
+            return_exceptions=True
+        )
 
-                response = self.gemini_model.generate_content(prompt)
-                if response and response.text:
-                    logger.info("✅ Wellness response generated using Gemini (fallback)")
-                    return response.text.strip()
-            except Exception as e:
-                logger.warning(f"Gemini wellness error: {e}")
+        for (fallback, futures), result in zip(grouped.values(), results):
+            if isinstance(result, BaseException):
+                logger.warning("batched generation failed: %s", result)
+                result = fallback
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
+
+    async def generate_wellness_response(self, query: str, user_context: Optional[Dict[str, Any]] = None, fallback: str = "") -> str:
+        """Generate wellness response with user context using Ollama (primary) and Gemini (fallback)"""
+        text = await self._generate_llm_text(query, user_context, self._wellness_gemini_prompt(query))
+        if text:
+            return text
 
         # Final fallback
         if not fallback:
-            fallback = f"Thank you for reaching out about '{query}'. It's important to take care of your wellbeing. Here are some gentle suggestions: Take time for self-care, practice deep breathing, stay connected with supportive people, and remember that small steps can lead to big improvements. If you're experiencing serious concerns, please consider speaking with a healthcare professional."
+            fallback = self.default_wellness_fallback(query)
 
-        logger.warning("⚠️  Both Ollama and Gemini failed for wellness, using hardcoded fallback")
+        logger.warning("all LLMs failed for wellness, using hardcoded fallback")
         return fallback
-    
-    def search_documents(self, query: str, store_type: str = "unified") -> list:
-        """Search relevant documents from vector store"""
-        if store_type in self.vector_stores:
+
+    async def _generate_llm_text(self, ollama_query: str, user_context: Optional[Dict[str, Any]],
+                                 gemini_prompt: str) -> Optional[str]:
+        """
+        Generate text with Ollama, then Gemini
+
+        With RACE_LLMS enabled and both backends configured, Gemini is started
+        once Ollama has had LLM_RACE_GRACE seconds (immediately if Ollama just
+        failed) and the first non-empty answer wins.
+
+        Returns:
+            Generated text, or None if every LLM failed
+        """
+        if RACE_LLMS and self.ollama_client and self.gemini_model:
+            return await self._race_llms(ollama_query, user_context, gemini_prompt)
+
+        text = await self._generate_with_ollama(ollama_query, user_context)
+        if text:
+            return text
+
+        text = await self._generate_with_gemini(gemini_prompt)
+        if text:
+            logger.info("response via gemini (fallback)")
+        return text
+
+    async def _race_llms(self, ollama_query: str, user_context: Optional[Dict[str, Any]],
+                         gemini_prompt: str) -> Optional[str]:
+        """Race Ollama against Gemini and cancel whichever loses"""
+        ollama_recently_failed = (
+            not self._ollama_healthy
+            and time.monotonic() - self._ollama_checked_at < OLLAMA_HEALTH_TTL
+        )
+        grace = 0.0 if ollama_recently_failed else LLM_RACE_GRACE
+
+        ollama_task = asyncio.create_task(self._generate_with_ollama(ollama_query, user_context))
+        done, _ = await asyncio.wait({ollama_task}, timeout=grace)
+        if done and ollama_task.result():
+            return ollama_task.result()
+
+        gemini_task = asyncio.create_task(self._generate_with_gemini(gemini_prompt))
+        pending = {task for task in (ollama_task, gemini_task) if not task.done()}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        logger.info("response via %s (race)", "ollama" if task is ollama_task else "gemini")
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _generate_with_ollama(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Generate a response with Ollama, or None on failure, tracking Ollama health"""
+        if not self.ollama_client:
+            return None
+        text = None
+        try:
+            result = await self.ollama_client.agenerate_wellness_response(query, user_context)
+            if result.get('success') and result.get('response'):
+                logger.info("response via ollama %.2fs", result.get('response_time', 0))
+                text = result['response']
+            else:
+                logger.warning("ollama failed to generate response")
+        except Exception as e:
+            logger.warning("ollama error: %s", e)
+
+        self._ollama_healthy = text is not None
+        self._ollama_checked_at = time.monotonic()
+        return text
+
+    async def _generate_with_gemini(self, prompt: str) -> Optional[str]:
+        """Generate a response with Gemini in a worker thread, or None on failure"""
+        if not self.gemini_model or time.monotonic() < self._gemini_open_until:
+            return None
+        try:
+            response = await asyncio.to_thread(self.gemini_model.generate_content, prompt)
+            if response and response.text:
+                self._gemini_healthy = True
+                self._gemini_failures.clear()
+                return response.text.strip()
+        except Exception as e:
+            logger.warning("gemini error: %s", e)
+            self._record_gemini_failure()
+        return None
+
+    @staticmethod
+    def _wellness_gemini_prompt(query: str) -> str:
+        """Basic wellness prompt for the Gemini fallback"""
+        return WELLNESS_GEMINI_PROMPT.format_map({"query": query})
+
+    async def stream_response(self, prompt: str, fallback: str) -> AsyncIterator[str]:
+        """Stream response tokens from Ollama, falling back to Gemini or the hardcoded response"""
+        async for token in self._stream_with_fallback(prompt, None, prompt, fallback):
+            yield token
+
+    async def stream_wellness_response(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream a wellness response with user context"""
+        async for token in self._stream_with_fallback(
+            query, user_context, self._wellness_gemini_prompt(query), self.default_wellness_fallback(query)
+        ):
+            yield token
+
+    async def _stream_with_fallback(self, ollama_query: str, user_context: Optional[Dict[str, Any]],
+                                    gemini_prompt: str, fallback: str) -> AsyncIterator[str]:
+        """
+        Yield Ollama tokens as they are generated
+
+        If Ollama produces nothing, the Gemini (or hardcoded) response is
+        yielded as a single chunk. A failure after tokens were sent is
+        re-raised, since the partial text cannot be replaced.
+        """
+        streamed = False
+        if self.ollama_client:
             try:
-                retriever = self.vector_stores[store_type].as_retriever(search_kwargs={"k": 3})
-                docs = retriever.invoke(query)
-                return [{"text": doc.page_content[:500], "source": doc.metadata.get("source", "unknown")} for doc in docs]
+                async for token in self.ollama_client.astream_wellness_response(ollama_query, user_context):
+                    streamed = True
+                    yield token
             except Exception as e:
-                logger.error(f"Vector search error: {e}")
-        return []
+                logger.warning("ollama streaming error: %s", e)
+                if streamed:
+                    raise
+        if streamed:
+            return
+
+        text = await self._generate_with_gemini(gemini_prompt)
+        if text:
+            logger.info("response via gemini (fallback)")
+            yield text
+            return
+
+        logger.warning("all LLMs failed, using hardcoded fallback")
+        yield fallback
+
+    def match_wellness_rule(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Return a canned wellness response for bare keyword queries
+
+        A canned response is only used when the query is the matched keyword
+        plus WELLNESS_FILLER_WORDS. Queries with mood/stress scores, crisis
+        terms or any other content always go to the LLM.
+
+        Args:
+            query: User's wellness query
+            user_context: Optional context (mood_score, stress_level, etc.)
+
+        Returns:
+            Canned response, or None if the LLM should answer
+        """
+        self.wellness_rule_requests += 1
+        response = None
+        has_scores = user_context and (
+            user_context.get('mood_score') is not None or user_context.get('stress_level') is not None
+        )
+        if (not has_scores and len(query.split()) <= WELLNESS_RULE_MAX_WORDS
+                and not WELLNESS_CRISIS_PATTERN.search(query)):
+            for pattern, canned in WELLNESS_PATTERNS:
+                if not pattern.search(query):
+                    continue
+                rest = WELLNESS_WORD_PATTERN.findall(pattern.sub(" ", query.lower()))
+                if all(word in WELLNESS_FILLER_WORDS for word in rest):
+                    response = canned
+                    self.wellness_rule_hits += 1
+                break
+
+        if self.wellness_rule_requests % WELLNESS_RULE_LOG_EVERY == 0:
+            logger.info("wellness rule hit rate %d/%d", self.wellness_rule_hits, self.wellness_rule_requests)
+        return response
+
+    def default_wellness_fallback(self, query: str) -> str:
+        """Hardcoded wellness response used when every LLM fails"""
+        return WELLNESS_FALLBACK.format_map({"query": query})
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Normalize a query for exact-match cache lookups"""
+        return " ".join(query.lower().split())
+
+    def _embed_uncached(self, normalized_query: str) -> np.ndarray:
+        """Run the embedding model on a normalized query"""
+        vec = np.asarray(self.embedding_model.embed_query(normalized_query), dtype=np.float32)
+        vec.setflags(write=False)
+        return vec
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query once, reusing the vector for repeated queries
+
+        Args:
+            query: Raw user query
+
+        Returns:
+            Read-only float32 embedding vector
+        """
+        return self._embedding_cache(self._normalize_query(query))
+
+    def _embed_cache_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query as an L2-normalized float32 row vector for the semantic cache"""
+        if self.embedding_model is None:
+            return None
+        try:
+            vec = self.embed_query(query).reshape(1, -1).copy()
+        except Exception as e:
+            logger.warning("semantic cache embedding failed: %s", e)
+            return None
+        faiss.normalize_L2(vec)
+        return vec
+
+    async def get_cached_response(self, namespace: str, query: str) -> Tuple[Optional[Tuple[str, list]], Optional[np.ndarray]]:
+        """
+        Look up a previously generated (response, sources) pair
+
+        The exact tier is checked on the event loop. On a miss the query is
+        embedded in a worker thread; the FAISS search over the small cache
+        index stays on the loop, which owns every write to it.
+
+        Args:
+            namespace: Cache partition (endpoint plus any user context)
+            query: Raw user query
+
+        Returns:
+            Tuple of (cached payload or None, query vector computed for the semantic tier)
+        """
+        now = time.monotonic()
+        key = (namespace, self._normalize_query(query))
+
+        entry = self.exact_cache.get(key)
+        if entry is not None:
+            stored_at, payload = entry
+            if now - stored_at <= RESPONSE_CACHE_TTL:
+                self.exact_cache.move_to_end(key)
+                logger.info("exact cache hit %s", namespace)
+                return payload, None
+            del self.exact_cache[key]
+
+        vec = await asyncio.to_thread(self._embed_cache_query, query)
+        index = self.semantic_indexes.get(namespace)
+        if index is None or vec is None or index.ntotal == 0:
+            return None, vec
+
+        scores, ids = index.search(vec, 1)
+        entry_id = int(ids[0, 0])
+        if entry_id >= 0 and scores[0, 0] >= SEMANTIC_CACHE_THRESHOLD:
+            _, stored_at, payload = self.semantic_payloads[entry_id]
+            if now - stored_at <= RESPONSE_CACHE_TTL:
+                logger.info("semantic cache hit %s sim=%.3f", namespace, scores[0, 0])
+                return payload, vec
+            self._evict_semantic(entry_id)
+
+        return None, vec
+
+    def cache_response(self, namespace: str, query: str, payload: Tuple[str, list],
+                       vec: Optional[np.ndarray] = None):
+        """Store a generated (response, sources) pair in both cache tiers"""
+        now = time.monotonic()
+        key = (namespace, self._normalize_query(query))
+        self.exact_cache[key] = (now, payload)
+        self.exact_cache.move_to_end(key)
+        while len(self.exact_cache) > RESPONSE_CACHE_SIZE:
+            self.exact_cache.popitem(last=False)
+
+        if vec is None:
+            return
+
+        index = self.semantic_indexes.get(namespace)
+        if index is None:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(vec.shape[1]))
+            self.semantic_indexes[namespace] = index
+
+        entry_id = self._semantic_next_id
+        self._semantic_next_id += 1
+        index.add_with_ids(vec, np.array([entry_id], dtype=np.int64))
+        self.semantic_payloads[entry_id] = (namespace, now, payload)
+        while len(self.semantic_payloads) > RESPONSE_CACHE_SIZE:
+            self._evict_semantic(next(iter(self.semantic_payloads)))
+
+    def _evict_semantic(self, entry_id: int):
+        """Drop one entry from the semantic cache tier"""
+        namespace, _, _ = self.semantic_payloads.pop(entry_id)
+        index = self.semantic_indexes[namespace]
+        index.remove_ids(np.array([entry_id], dtype=np.int64))
+        if index.ntotal == 0:
+            del self.semantic_indexes[namespace]
+
+    @staticmethod
+    def _format_docs(docs) -> list:
+        """Convert retrieved documents to API source entries"""
+        return [
+            {
+                "text": doc.metadata.get("_preview") or doc.page_content[:SOURCE_PREVIEW_CHARS],
+                "source": doc.metadata.get("source", "unknown")
+            }
+            for doc in docs
+        ]
+
+    async def search_documents(self, query: str, store_type: str = "unified") -> list:
+        """Search relevant documents from vector store without blocking the event loop"""
+        return await asyncio.to_thread(self._search_documents_sync, query, store_type)
+
+    async def search_documents_multi(self, query: str, store_types: List[str]) -> Dict[str, list]:
+        """Search several vector stores in a worker thread"""
+        return await asyncio.to_thread(self._search_documents_multi_sync, query, store_types)
+
+    async def search_merged(self, query: str, k: int = 3) -> Optional[list]:
+        """Search the merged vedas + educational index in a worker thread"""
+        return await asyncio.to_thread(self._search_merged_sync, query, k)
+
+    def _search_documents_sync(self, query: str, store_type: str = "unified") -> list:
+        """Search relevant documents from vector store"""
+        return self._search_documents_multi_sync(query, [store_type])[store_type]
+
+    def _search_merged_sync(self, query: str, k: int = 3) -> Optional[list]:
+        """
+        Search the merged vedas + educational index for the global top-k
+
+        Returns:
+            Source entries, or None if no merged index is available
+        """
+        if self._merged_index is None:
+            return None
+        try:
+            vec = self.embed_query(query).reshape(1, -1)
+            _, ids = self._merged_index.search(vec, k)
+        except Exception as e:
+            logger.error("merged search error: %s", e)
+            return None
+        return self._format_docs(self._id_to_doc[int(i)] for i in ids[0] if i >= 0)
+
+    def _search_documents_multi_sync(self, query: str, store_types: List[str]) -> Dict[str, list]:
+        """
+        Search several vector stores with a single query embedding
+
+        Args:
+            query: User query
+            store_types: Vector store names to search
+
+        Returns:
+            Mapping of store name to its top-3 source entries
+        """
+        results = {store_type: [] for store_type in store_types}
+        if not any(store_type in self.vector_stores for store_type in store_types):
+            return results
+
+        try:
+            embedding = self.embed_query(query).tolist()
+        except Exception as e:
+            logger.error("query embedding error: %s", e)
+            return results
 
-# Global engine instance
-engine = SimpleOrchestrationEngine()
+        for store_type in store_types:
+            if store_type in self.vector_stores:
+                try:
+                    docs = self.vector_stores[store_type].similarity_search_by_vector(embedding, k=3)
+                    results[store_type] = self._format_docs(docs)
+                except Exception as e:
+                    logger.error("vector search error: %s", e)
+        return results
+
+# Global engine instance, built by the lifespan handler so only the process
+# that serves requests loads the LLM clients and forecasting models
+engine: Optional[SimpleOrchestrationEngine] = None
 
 # Pydantic models
 class QueryRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     query: str
     user_id: Optional[str] = "anonymous"
+    stream: bool = False
 
 class WellnessRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     query: str
     user_id: Optional[str] = "anonymous"
     mood_score: Optional[float] = None
     stress_level: Optional[float] = None
+    stream: bool = False
 
 class SimpleResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     query_id: str
     query: str
     response: str
@@ -321,25 +963,77 @@ class SimpleResponse(BaseModel):
     timestamp: str
     endpoint: str
 
+def sse_event(payload: Dict[str, Any]) -> bytes:
+    """Format one server-sent event"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+async def single_chunk(text: str) -> AsyncIterator[str]:
+    """Wrap an already complete response as a one-chunk token stream"""
+    yield text
+
+def streaming_response(tokens: AsyncIterator[str], query: str, sources: list, endpoint: str,
+                       on_complete: Optional[Callable[[str], None]] = None) -> StreamingResponse:
+    """
+    Stream response tokens as server-sent events
+
+    Each token is sent as {"response": token}; a final event carries the
+    query_id, sources and timestamp that the JSON response would contain.
+    on_complete receives the full text once the stream finishes. If the
+    token stream fails partway, an {"error": ...} event is sent instead and
+    on_complete is not called, so truncated text is never cached.
+    """
+    query_id = uuid.uuid4().hex
+
+    async def events():
+        parts = []
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield sse_event({"response": token})
+        except Exception as e:
+            logger.error("%s stream failed after %d chunks: %s", endpoint, len(parts), e)
+            yield sse_event({"error": "Response stream was interrupted", "query_id": query_id, "endpoint": endpoint})
+            return
+        if on_complete is not None:
+            on_complete("".join(parts))
+        yield sse_event({
+            "done": True,
+            "query_id": query_id,
+            "query": query,
+            "sources": sources,
+            "timestamp": engine.timestamp,
+            "endpoint": endpoint
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 # Lifespan handler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global engine
+
     # Startup
     logger.info("Starting Simple Orchestration API...")
-    engine.initialize_vector_stores()
+    engine = SimpleOrchestrationEngine()
+    await engine.initialize_vector_stores()
+    engine.start_clock()
     logger.info("Simple Orchestration API ready!")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Simple Orchestration API...")
+    await engine.stop_clock()
+    if engine.ollama_client:
+        await engine.ollama_client.aclose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Simple Orchestration API",
     description="Three simple endpoints: ask-vedas, edumentor, wellness with GET and POST methods",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -356,46 +1050,64 @@ app.add_middleware(
 @app.get("/ask-vedas")
 async def ask_vedas_get(
     query: str = Query(..., description="Your spiritual question"),
-    user_id: str = Query("anonymous", description="User ID")
+    user_id: str = Query("anonymous", description="User ID"),
+    stream: bool = Query(False, description="Stream the response as server-sent events")
 ):
     """GET method for Vedas spiritual wisdom"""
-    return await process_vedas_query(query, user_id)
+    return await process_vedas_query(query, user_id, stream)
 
 @app.post("/ask-vedas")
 async def ask_vedas_post(request: QueryRequest):
     """POST method for Vedas spiritual wisdom"""
-    return await process_vedas_query(request.query, request.user_id)
+    return await process_vedas_query(request.query, request.user_id, request.stream)
 
-async def process_vedas_query(query: str, user_id: str):
+async def process_vedas_query(query: str, user_id: str, stream: bool = False):
     """Process Vedas query and return spiritual wisdom"""
     try:
+        cached, query_vec = await engine.get_cached_response("ask-vedas", query)
+        if cached is not None:
+            response_text, sources = cached
+            if stream:
+                return streaming_response(single_chunk(response_text), query, sources, "ask-vedas")
+            return SimpleResponse(
+                query_id=uuid.uuid4().hex,
+                query=query,
+                response=response_text,
+                sources=sources,
+                timestamp=engine.timestamp,
+                endpoint="ask-vedas"
+            )
+
         # Search relevant documents
-        sources = engine.search_documents(query, "vedas")
+        sources = await engine.search_documents(query, "vedas")
         context = "\n".join([doc["text"] for doc in sources[:2]])
         
         # Generate response
-        prompt = f"""You are a wise spiritual teacher. Based on ancient Vedic wisdom, provide profound guidance for this question: "{query}"
-
-Context from sacred texts:
-{context}
-
-Provide spiritual wisdom that is authentic, practical, and inspiring. Keep it concise but meaningful."""
-
-        fallback = f"The ancient Vedic texts teach us to seek truth through self-reflection and righteous action. Regarding '{query}', remember that true wisdom comes from understanding the interconnectedness of all existence. Practice mindfulness, act with compassion, and seek the divine within yourself."
+        values = {"query": query, "context": context}
+        prompt = VEDAS_PROMPT.format_map(values)
+        fallback = VEDAS_FALLBACK.format_map(values)
         
-        response_text = engine.generate_response(prompt, fallback)
+        if stream:
+            def cache_streamed(text: str):
+                if text != fallback:
+                    engine.cache_response("ask-vedas", query, (text, sources), query_vec)
+            return streaming_response(engine.stream_response(prompt, fallback), query, sources, "ask-vedas", cache_streamed)
+
+        response_text = await engine.generate_response_batched(prompt, fallback)
+        if response_text != fallback:
+            engine.cache_response("ask-vedas", query, (response_text, sources), query_vec)
         
         return SimpleResponse(
-            query_id=str(uuid.uuid4()),
+            query_id=uuid.uuid4().hex,
             query=query,
             response=response_text,
             sources=sources,
-            timestamp=datetime.now().isoformat(),
+            timestamp=engine.timestamp,
             endpoint="ask-vedas"
         )
         
     except Exception as e:
-        logger.error(f"Error in ask-vedas: {e}")
+        logger.error("Error in ask-vedas: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== EDUMENTOR ENDPOINTS ====================
@@ -403,66 +1115,75 @@ Provide spiritual wisdom that is authentic, practical, and inspiring. Keep it co
 @app.get("/edumentor")
 async def edumentor_get(
     query: str = Query(..., description="Your learning question"),
-    user_id: str = Query("anonymous", description="User ID")
+    user_id: str = Query("anonymous", description="User ID"),
+    stream: bool = Query(False, description="Stream the response as server-sent events")
 ):
     """GET method for educational content"""
-    return await process_edumentor_query(query, user_id)
+    return await process_edumentor_query(query, user_id, stream)
 
 @app.post("/edumentor")
 async def edumentor_post(request: QueryRequest):
     """POST method for educational content"""
-    return await process_edumentor_query(request.query, request.user_id)
+    return await process_edumentor_query(request.query, request.user_id, request.stream)
 
-async def process_edumentor_query(query: str, user_id: str):
+async def process_edumentor_query(query: str, user_id: str, stream: bool = False):
     """Process educational query and return learning content"""
     try:
-        # Search relevant documents from multiple stores for comprehensive results
-        all_sources = []
-
-        # Search in vedas store for spiritual/vedic content
-        vedas_sources = engine.search_documents(query, "vedas")
-        all_sources.extend(vedas_sources)
-
-        # Search in educational store for curriculum content
-        educational_sources = engine.search_documents(query, "educational")
-        all_sources.extend(educational_sources)
-
-        # Search in unified store as fallback
+        cached, query_vec = await engine.get_cached_response("edumentor", query)
+        if cached is not None:
+            response_text, sources = cached
+            if stream:
+                return streaming_response(single_chunk(response_text), query, sources, "edumentor")
+            return SimpleResponse(
+                query_id=uuid.uuid4().hex,
+                query=query,
+                response=response_text,
+                sources=sources,
+                timestamp=engine.timestamp,
+                endpoint="edumentor"
+            )
+
+        # Search vedas (spiritual/vedic) and educational (curriculum) content,
+        # globally ranked in one merged index when available
+        all_sources = await engine.search_merged(query)
+        if all_sources is None:
+            results = await engine.search_documents_multi(query, MERGED_STORE_TYPES)
+            all_sources = results["vedas"] + results["educational"]
+
+        # Search in unified store as fallback (the embedding is cached)
         if not all_sources:
-            unified_sources = engine.search_documents(query, "unified")
-            all_sources.extend(unified_sources)
+            all_sources = await engine.search_documents(query, "unified")
 
         # Use the best sources for context
         sources = all_sources[:3]  # Take top 3 sources
         context = "\n".join([doc["text"] for doc in sources])
         
         # Generate response
-        prompt = f"""You are an expert educator. Explain this topic clearly and engagingly: "{query}"
-
-Educational context:
-{context}
-
-Provide a clear, comprehensive explanation that:
-- Uses simple, understandable language
-- Includes practical examples
-- Makes the topic interesting and memorable
-- Is suitable for students"""
-
-        fallback = f"Great question about '{query}'! This is an important topic to understand. Let me break it down for you in simple terms with practical examples that will help you learn and remember the key concepts. The main idea is to understand the fundamental principles and how they apply in real-world situations."
+        values = {"query": query, "context": context}
+        prompt = EDUMENTOR_PROMPT.format_map(values)
+        fallback = EDUMENTOR_FALLBACK.format_map(values)
         
-        response_text = engine.generate_response(prompt, fallback)
+        if stream:
+            def cache_streamed(text: str):
+                if text != fallback:
+                    engine.cache_response("edumentor", query, (text, sources), query_vec)
+            return streaming_response(engine.stream_response(prompt, fallback), query, sources, "edumentor", cache_streamed)
+
+        response_text = await engine.generate_response_batched(prompt, fallback)
+        if response_text != fallback:
+            engine.cache_response("edumentor", query, (response_text, sources), query_vec)
         
         return SimpleResponse(
-            query_id=str(uuid.uuid4()),
+            query_id=uuid.uuid4().hex,
             query=query,
             response=response_text,
             sources=sources,
-            timestamp=datetime.now().isoformat(),
+            timestamp=engine.timestamp,
             endpoint="edumentor"
         )
         
     except Exception as e:
-        logger.error(f"Error in edumentor: {e}")
+        logger.error("Error in edumentor: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== WELLNESS ENDPOINTS ====================
@@ -470,14 +1191,19 @@ Provide a clear, comprehensive explanation that:
 @app.get("/wellness")
 async def wellness_get(
     query: str = Query(..., description="Your wellness concern"),
-    user_id: str = Query("anonymous", description="User ID")
+    user_id: str = Query("anonymous", description="User ID"),
+    stream: bool = Query(False, description="Stream the response as server-sent events")
 ):
     """GET method for wellness advice"""
-    return await process_wellness_query(query, user_id, {})
+    return await process_wellness_query(query, user_id, {}, stream)
 
 @app.post("/wellness")
 async def wellness_post(request: WellnessRequest):
     """POST method for wellness advice with optional context"""
+    return await process_wellness_query(request.query, request.user_id, _user_context(request), request.stream)
+
+def _user_context(request: WellnessRequest) -> Dict[str, Any]:
+    """Collect the optional wellness context fields that were provided"""
     user_context = {}
     if request.mood_score is not None:
         user_context['mood_score'] = request.mood_score
@@ -485,70 +1211,95 @@ async def wellness_post(request: WellnessRequest):
         user_context['stress_level'] = request.stress_level
     if request.user_id:
         user_context['user_id'] = request.user_id
+    return user_context
 
-    return await process_wellness_query(request.query, request.user_id, user_context)
+async def process_wellness_query(query: str, user_id: str, user_context: Optional[Dict[str, Any]] = None,
+                                 stream: bool = False, include_context: bool = False):
+    """
+    Process wellness query and return health advice
 
-async def process_wellness_query(query: str, user_id: str, user_context: Optional[Dict[str, Any]] = None):
-    """Process wellness query and return health advice"""
-    try:
-        # Search relevant documents
-        sources = engine.search_documents(query, "wellness")
+    With include_context the /ask-wellness shape is returned, which adds the
+    user context and LLM provider to the response.
+    """
+    endpoint = "ask-wellness" if include_context else "wellness"
 
-        # Use the new wellness-specific method with user context
-        response_text = engine.generate_wellness_response(query, user_context)
-        
+    def respond(response_text: str, sources: list):
+        if include_context:
+            return {
+                "query_id": uuid.uuid4().hex,
+                "query": query,
+                "response": response_text,
+                "sources": sources,
+                "user_context": user_context,
+                "timestamp": engine.timestamp,
+                "endpoint": endpoint,
+                "llm_provider": "ollama_primary" if engine.ollama_client else "gemini_fallback"
+            }
         return SimpleResponse(
-            query_id=str(uuid.uuid4()),
+            query_id=uuid.uuid4().hex,
             query=query,
             response=response_text,
             sources=sources,
-            timestamp=datetime.now().isoformat(),
-            endpoint="wellness"
+            timestamp=engine.timestamp,
+            endpoint=endpoint
         )
-        
-    except Exception as e:
-        logger.error(f"Error in wellness: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/ask-wellness")
-async def ask_wellness_post(request: WellnessRequest):
-    """Enhanced wellness endpoint with full orchestration and context"""
     try:
-        # Search relevant documents
-        sources = engine.search_documents(request.query, "wellness")
-
-        # Prepare user context
-        user_context = {}
-        if request.mood_score is not None:
-            user_context['mood_score'] = request.mood_score
-        if request.stress_level is not None:
-            user_context['stress_level'] = request.stress_level
-        if request.user_id:
-            user_context['user_id'] = request.user_id
+        # Short, common concerns get a deterministic answer without the LLM
+        canned = engine.match_wellness_rule(query, user_context)
+        if canned is not None:
+            if stream:
+                return streaming_response(single_chunk(canned), query, [], endpoint)
+            return respond(canned, [])
+
+        # User context changes the prompt, so it partitions the cache
+        namespace = "wellness"
+        if user_context:
+            namespace += "|" + ",".join(f"{k}={v}" for k, v in sorted(user_context.items()))
+
+        cached, query_vec = await engine.get_cached_response(namespace, query)
+        if cached is not None:
+            response_text, sources = cached
+            if stream:
+                return streaming_response(single_chunk(response_text), query, sources, endpoint)
+            return respond(response_text, sources)
 
-        # Generate enhanced response with context
-        response_text = engine.generate_wellness_response(request.query, user_context)
+        # Search relevant documents
+        sources = await engine.search_documents(query, "wellness")
 
-        return {
-            "query_id": str(uuid.uuid4()),
-            "query": request.query,
-            "response": response_text,
-            "sources": sources,
-            "user_context": user_context,
-            "timestamp": datetime.now().isoformat(),
-            "endpoint": "ask-wellness",
-            "llm_provider": "ollama_primary" if engine.ollama_client else "gemini_fallback"
-        }
+        if stream:
+            def cache_streamed(text: str):
+                if text != engine.default_wellness_fallback(query):
+                    engine.cache_response(namespace, query, (text, sources), query_vec)
+            return streaming_response(
+                engine.stream_wellness_response(query, user_context), query, sources, endpoint, cache_streamed
+            )
 
+        # Use the new wellness-specific method with user context
+        response_text = await engine.generate_wellness_response(query, user_context)
+        if response_text != engine.default_wellness_fallback(query):
+            engine.cache_response(namespace, query, (response_text, sources), query_vec)
+        
+        return respond(response_text, sources)
+        
     except Exception as e:
-        logger.error(f"Error in ask-wellness: {e}")
+        logger.error("Error in %s: %s", endpoint, e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/ask-wellness")
+async def ask_wellness_post(request: WellnessRequest):
+    """Enhanced wellness endpoint with full orchestration and context"""
+    return await process_wellness_query(
+        request.query, request.user_id, _user_context(request), request.stream, include_context=True
+    )
+
 # ==================== ROOT ENDPOINT ====================
 
 # Forecasting endpoints
 class ForecastRequest(BaseModel):
     """Request model for forecasting"""
+    model_config = ConfigDict(extra="ignore")
+
     data: list
     metric_type: str = "general"
     forecast_periods: int = 30
@@ -571,7 +1322,7 @@ async def generate_forecast_endpoint(request: ForecastRequest):
             "sentiment": "neutral" if result["status"] == "success" else "negative",
             "content": result,
             "metadata": {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": engine.timestamp,
                 "user_id": request.user_id,
                 "metric_type": request.metric_type,
                 "forecast_periods": request.forecast_periods,
@@ -580,7 +1331,7 @@ async def generate_forecast_endpoint(request: ForecastRequest):
         }
 
     except Exception as e:
-        logger.error(f"Forecast endpoint error: {e}")
+        logger.error("Forecast endpoint error: %s", e)
         return {
             "report_type": "forecast",
             "language": "en",
@@ -590,7 +1341,7 @@ async def generate_forecast_endpoint(request: ForecastRequest):
                 "message": f"Forecast generation failed: {str(e)}"
             },
             "metadata": {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": engine.timestamp,
                 "user_id": request.user_id,
                 "error": True
             }
@@ -604,7 +1355,7 @@ async def forecast_status():
         "available_models": ["prophet", "arima", "auto"] if engine.forecasting_enabled else [],
         "metric_types": ["probability", "load", "general"],
         "dependencies_installed": FORECASTING_AVAILABLE,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": engine.timestamp
     }
 
 @app.get("/")
@@ -648,14 +1399,22 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Simple Orchestration API")
     parser.add_argument("--port", type=int, default=8000, help="Port to run the server on (default: 8000)")
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to run the server on (default: 0.0.0.0)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes, each with its own engine and models (default: 1)")
     args = parser.parse_args()
 
+    # uvloop and httptools ship with uvicorn[standard] but not on Windows
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
     print("\n" + "="*60)
     print("  SIMPLE ORCHESTRATION API WITH ADVANCED FORECASTING")
     print("="*60)
     print(f" Server URL: http://{args.host}:{args.port}")
     print(f" API Documentation: http://{args.host}:{args.port}/docs")
     print(f" Forecasting Enabled: {FORECASTING_AVAILABLE}")
+    print(f" Workers: {args.workers} (loop: {loop}, http: {http})")
+    print("   Size OLLAMA_NUM_PARALLEL on the Ollama server for workers x concurrency")
     print("\n Endpoints:")
     print("   GET/POST /ask-vedas - Spiritual wisdom")
     print("   GET/POST /edumentor - Educational content")
@@ -665,4 +1424,12 @@ if __name__ == "__main__":
         print("   GET /forecast/status - Forecasting system status")
     print("="*60)
 
-    uvicorn.run(app, host=args.host, port=args.port)
+    # Multiple workers need an import string so each process builds its own app
+    uvicorn.run(
+        "simple_api:app" if args.workers > 1 else app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http
+    )
@@ -3,24 +3,189 @@ Smart Model Selection Logic
 Implements intelligent model selection with Prophet primary, ARIMA fallback, and performance tracking
 """
 
+from __future__ import annotations
+
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Any, Union
 import logging
 from datetime import datetime, timedelta
 import json
 import warnings
+from dataclasses import dataclass, field, fields
+from concurrent.futures import ThreadPoolExecutor
+
+# Our model modules pull in Prophet/Stan and statsmodels, so they are imported
+# where a model is trained; importing the selector alone stays cheap
+if TYPE_CHECKING:
+    from enhanced_prophet_model import EnhancedProphetModel
+    from enhanced_arima_model import EnhancedARIMAModel
+    from model_performance_evaluator import ModelPerformanceEvaluator
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-# Import our custom models
-from enhanced_prophet_model import EnhancedProphetModel
-from enhanced_arima_model import EnhancedARIMAModel
-from model_performance_evaluator import ModelPerformanceEvaluator
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Run the kernel as plain Python when numba is not installed"""
+        return lambda func: func
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+# Optional Prophet capacity columns carried through data preparation
+PROPHET_EXTRA_COLUMNS = ('cap', 'floor')
+
+# Prophet interval Monte Carlo draws for the train/test evaluation fits; a
+# model returned to callers gets the configured count back before predicting
+EVALUATION_UNCERTAINTY_SAMPLES = 200
+
+
+@njit(cache=True, fastmath=True)
+def _acf_two_lags(x, lag1, lag2):
+    """
+    Autocorrelations at lags lag1 and lag2 in one pass over x
+
+    Each lag is the Pearson correlation of x[:-lag] with x[lag:], as in
+    pandas.Series.autocorr. Lags that do not fit in x return 0.0. The sums
+    are float64 even for float32 input to avoid cancellation in the
+    variance terms.
+    """
+    n = x.shape[0]
+    m1 = n - lag1
+    m2 = n - lag2
+    s1_a = s2_a = ss1_a = ss2_a = s12_a = 0.0
+    s1_b = s2_b = ss1_b = ss2_b = s12_b = 0.0
+
+    for i in range(max(m1, m2)):
+        if i < m1:
+            u = float(x[i])
+            v = float(x[i + lag1])
+            s1_a += u
+            s2_a += v
+            ss1_a += u * u
+            ss2_a += v * v
+            s12_a += u * v
+        if i < m2:
+            u = float(x[i])
+            v = float(x[i + lag2])
+            s1_b += u
+            s2_b += v
+            ss1_b += u * u
+            ss2_b += v * v
+            s12_b += u * v
+
+    # Relative tolerance so constant series give NaN like pandas despite fastmath rounding
+    eps = 1e-12
+    acf_a = 0.0
+    if m1 > 1:
+        cov = s12_a - s1_a * s2_a / m1
+        var1 = ss1_a - s1_a * s1_a / m1
+        var2 = ss2_a - s2_a * s2_a / m1
+        acf_a = cov / np.sqrt(var1 * var2) if var1 > eps * ss1_a and var2 > eps * ss2_a else np.nan
+
+    acf_b = 0.0
+    if m2 > 1:
+        cov = s12_b - s1_b * s2_b / m2
+        var1 = ss1_b - s1_b * s1_b / m2
+        var2 = ss2_b - s2_b * s2_b / m2
+        acf_b = cov / np.sqrt(var1 * var2) if var1 > eps * ss1_b and var2 > eps * ss2_b else np.nan
+
+    return acf_a, acf_b
+
+
+def _fit_eval_prophet(train_data: pd.DataFrame, test_data: pd.DataFrame,
+                      metric_type: str) -> Tuple[EnhancedProphetModel, Dict[str, Any]]:
+    """Fit and evaluate a Prophet model (run in a worker thread during full evaluation)"""
+    from enhanced_prophet_model import EnhancedProphetModel
+    from model_performance_evaluator import ModelPerformanceEvaluator
+    
+    logger.info("Training Prophet model...")
+    prophet_model = EnhancedProphetModel(metric_type, uncertainty_samples=EVALUATION_UNCERTAINTY_SAMPLES)
+    prophet_model.fit(train_data)
+    prophet_eval = ModelPerformanceEvaluator().evaluate_model(
+        prophet_model, train_data, test_data, 'prophet'
+    )
+    return prophet_model, prophet_eval
+
+
+def _fit_eval_arima(train_data: pd.DataFrame, test_data: pd.DataFrame,
+                    metric_type: str) -> Tuple[EnhancedARIMAModel, Dict[str, Any]]:
+    """Fit and evaluate an ARIMA model (run in a worker thread during full evaluation)"""
+    from enhanced_arima_model import EnhancedARIMAModel
+    from model_performance_evaluator import ModelPerformanceEvaluator
+    
+    logger.info("Training ARIMA model...")
+    arima_model = EnhancedARIMAModel(metric_type)
+    arima_model.fit(train_data)
+    arima_eval = ModelPerformanceEvaluator().evaluate_model(
+        arima_model, train_data, test_data, 'arima'
+    )
+    return arima_model, arima_eval
+
+
+@dataclass(frozen=True, slots=True)
+class SelectionResult:
+    """
+    Outcome of a model selection
+
+    model_object holds the fitted model for 'prophet' and 'arima' selections
+    and is left out of to_dict()/to_json() output along with unset fields.
+    """
+    selected_model: str
+    selection_reason: str
+    confidence: str
+    timestamp: str
+    data_assessment: Optional[Dict[str, Any]] = None
+    model_object: Any = field(default=None, repr=False)
+    evaluation_results: Optional[Dict[str, Any]] = None
+    comparison_results: Optional[Dict[str, Any]] = None
+    forecast_method: Optional[str] = None
+    error: Optional[str] = None
+    
+    def to_dict(self, include_model: bool = False) -> Dict[str, Any]:
+        """
+        Convert to a plain dict of the fields that are set
+        
+        Args:
+            include_model: Keep the fitted model_object in the output
+            
+        Returns:
+            Selection result dictionary
+        """
+        result = {}
+        for result_field in fields(self):
+            value = getattr(self, result_field.name)
+            if value is None or (result_field.name == 'model_object' and not include_model):
+                continue
+            result[result_field.name] = value
+        return result
+    
+    def to_json(self) -> bytes:
+        """Serialize the result (without the fitted model) to JSON bytes"""
+        result = self.to_dict()
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(result, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(result, default=str).encode()
+
+
+# Candidate models trained side by side during full evaluation
+FIT_EVAL_FUNCTIONS = {
+    'prophet': _fit_eval_prophet,
+    'arima': _fit_eval_arima
+}
+
+
 class SmartModelSelector:
     """
     Intelligent model selection system with automatic fallback and performance tracking
@@ -34,7 +199,7 @@ class SmartModelSelector:
             metric_type: Type of metric ('probability', 'load', 'general')
         """
         self.metric_type = metric_type
-        self.performance_evaluator = ModelPerformanceEvaluator()
+        self._performance_evaluator = None
         self.model_history = {}
         self.selected_model = None
         self.selection_reason = ""
@@ -44,8 +209,16 @@ class SmartModelSelector:
             'mape': 20.0
         }
         
+    @property
+    def performance_evaluator(self) -> ModelPerformanceEvaluator:
+        """This selector's performance evaluator, created on first use"""
+        if self._performance_evaluator is None:
+            from model_performance_evaluator import ModelPerformanceEvaluator
+            self._performance_evaluator = ModelPerformanceEvaluator()
+        return self._performance_evaluator
+    
     def select_best_model(self, data: pd.DataFrame, date_col: str = 'ds', 
-                         value_col: str = 'y', force_evaluation: bool = False) -> Dict[str, Any]:
+                         value_col: str = 'y', force_evaluation: bool = False) -> SelectionResult:
         """
         Select the best model based on data characteristics and performance
         
@@ -56,7 +229,7 @@ class SmartModelSelector:
             force_evaluation: Force full evaluation even with sufficient data
             
         Returns:
-            Model selection results dictionary
+            Model selection result
         """
         try:
             logger.info(f"Starting smart model selection for {self.metric_type} metric...")
@@ -79,41 +252,102 @@ class SmartModelSelector:
             logger.error(f"Error in model selection: {e}")
             return self._fallback_selection(str(e))
     
+    @classmethod
+    def batch_select(cls, dfs: List[pd.DataFrame], metric_types: List[str],
+                     n_jobs: int = -1) -> List[SelectionResult]:
+        """
+        Select models for several series in parallel, one worker per series
+        
+        Args:
+            dfs: Time series dataframes with 'ds' and 'y' columns
+            metric_types: Metric type for each dataframe
+            n_jobs: Number of parallel workers (-1 uses all cores)
+            
+        Returns:
+            Selection results in the same order as dfs
+        """
+        from joblib import Parallel, delayed
+        
+        if len(dfs) != len(metric_types):
+            raise ValueError(f"Got {len(dfs)} dataframes but {len(metric_types)} metric types")
+        
+        logger.info(f"Selecting models for {len(dfs)} series in parallel...")
+        
+        return Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(cls(metric_type).select_best_model)(df)
+            for df, metric_type in zip(dfs, metric_types)
+        )
+    
     def _prepare_data(self, data: pd.DataFrame, date_col: str, value_col: str) -> pd.DataFrame:
         """Prepare and validate data for model selection"""
-        df = data.copy()
-        
-        # Ensure proper column names
-        if date_col != 'ds':
-            df = df.rename(columns={date_col: 'ds'})
-        if value_col != 'y':
-            df = df.rename(columns={value_col: 'y'})
+        # Project only the columns the models use so copies don't scale with input width
+        columns = [date_col, value_col] + [col for col in PROPHET_EXTRA_COLUMNS if col in data.columns]
+        df = data[columns].rename(columns={date_col: 'ds', value_col: 'y'})
         
-        # Ensure datetime format and sort
-        df['ds'] = pd.to_datetime(df['ds'])
-        df = df.sort_values('ds').reset_index(drop=True)
+        # Upstream code often passes already-clean series (datetime, strictly
+        # increasing, no missing values); skip parse/fill/sort/dedupe for those
+        already_clean = (
+            pd.api.types.is_datetime64_any_dtype(df['ds'])
+            and df['ds'].is_monotonic_increasing
+            and df['ds'].is_unique
+            and not df['y'].hasnans
+        )
         
-        # Handle missing values
-        df['y'] = df['y'].fillna(df['y'].median())
+        if already_clean:
+            df = df.reset_index(drop=True)
+        else:
+            # Ensure datetime format; API callers usually pass datetimes already, so
+            # only parse other dtypes (cache=True parses repeated timestamps once)
+            if not pd.api.types.is_datetime64_any_dtype(df['ds']):
+                df['ds'] = pd.to_datetime(df['ds'], cache=True)
+            
+            # Stable sort, so the first row of each duplicated timestamp stays first
+            df = df.sort_values('ds', kind='mergesort', ignore_index=True)
+            
+            # Remove duplicates: after sorting they are adjacent, so one int64
+            # comparison pass replaces drop_duplicates' hash table
+            if len(df) > 1:
+                ds_int = df['ds'].values.view('i8')
+                keep = np.empty(len(df), dtype=bool)
+                keep[0] = True
+                np.not_equal(ds_int[1:], ds_int[:-1], out=keep[1:])
+                if not keep.all():
+                    df = df[keep].reset_index(drop=True)
+            
+            # Handle missing values by interpolating in time order, which keeps the
+            # trend intact where a median fill would inject flat segments; the ends
+            # take the nearest valid value
+            if df['y'].hasnans:
+                df['y'] = df['y'].interpolate(method='linear', limit_direction='both')
         
-        # Remove duplicates
-        df = df.drop_duplicates(subset=['ds']).reset_index(drop=True)
+        # float32 halves the bytes every later pass streams; metric values need
+        # far fewer than its ~7 significant digits. Reductions accumulate in float64.
+        if df['y'].dtype == np.float64 and df['y'].abs().max() < np.finfo(np.float32).max:
+            df['y'] = df['y'].astype(np.float32, copy=False)
         
         logger.info(f"Prepared data: {len(df)} records from {df['ds'].min()} to {df['ds'].max()}")
         return df
     
     def _assess_data_quality(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Assess data quality and characteristics"""
+        # Work on the raw array so each statistic is one scan without Series temporaries
+        y = data['y'].to_numpy()
+        variance = np.nanvar(y, ddof=1, dtype=np.float64)
+        
+        # _prepare_data sorts by ds, so the range is just the two ends
+        ds = data['ds']
+        n = len(data)
+        
         assessment = {
-            'data_points': len(data),
-            'date_range_days': (data['ds'].max() - data['ds'].min()).days,
-            'missing_values': data['y'].isna().sum(),
-            'zero_values': (data['y'] == 0).sum(),
-            'negative_values': (data['y'] < 0).sum(),
-            'variance': float(data['y'].var()),
-            'mean': float(data['y'].mean()),
-            'std': float(data['y'].std()),
-            'trend_direction': 'increasing' if data['y'].iloc[-1] > data['y'].iloc[0] else 'decreasing',
+            'data_points': n,
+            'date_range_days': (ds.iloc[-1] - ds.iloc[0]).days if n else 0,
+            'missing_values': int(np.isnan(y).sum()),
+            'zero_values': int(np.count_nonzero(y == 0)),
+            'negative_values': int(np.count_nonzero(y < 0)),
+            'variance': float(variance),
+            'mean': float(np.nanmean(y, dtype=np.float64)),
+            'std': float(np.sqrt(variance)),
+            'trend_direction': self._trend_direction(y),
             'seasonality_detected': self._detect_seasonality(data['y'])
         }
         
@@ -129,22 +363,26 @@ class SmartModelSelector:
         assessment['quality_score'] = max(0.0, quality_score)
         
         logger.info(f"Data assessment - Points: {assessment['data_points']}, "
-                   f"Quality: {assessment['quality_score']:.2f}, "
-                   f"Seasonality: {assessment['seasonality_detected']}")
+                   f"Quality: {assessment['quality_score']:.2f}")
         
         return assessment
     
+    def _trend_direction(self, y: np.ndarray) -> str:
+        """Direction of the least-squares linear trend"""
+        mask = ~np.isnan(y)
+        if mask.sum() < 2:
+            return 'decreasing'
+        slope = np.polyfit(np.flatnonzero(mask), y[mask].astype(np.float64), 1)[0]
+        return 'increasing' if slope > 0 else 'decreasing'
+    
     def _detect_seasonality(self, series: pd.Series) -> bool:
         """Simple seasonality detection"""
         try:
             if len(series) < 14:  # Need at least 2 weeks for weekly seasonality
                 return False
             
-            # Check for weekly pattern (7-day cycle)
-            autocorr_7 = series.autocorr(lag=7) if len(series) > 7 else 0
-            
-            # Check for monthly pattern (30-day cycle)
-            autocorr_30 = series.autocorr(lag=30) if len(series) > 30 else 0
+            # Weekly (7-day) and monthly (30-day) cycles in one fused pass
+            autocorr_7, autocorr_30 = _acf_two_lags(series.to_numpy(), 7, 30)
             
             # Consider seasonality if autocorrelation > 0.3
             return abs(autocorr_7) > 0.3 or abs(autocorr_30) > 0.3
@@ -152,7 +390,7 @@ class SmartModelSelector:
         except Exception:
             return False
     
-    def _handle_insufficient_data(self, data: pd.DataFrame, assessment: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_insufficient_data(self, data: pd.DataFrame, assessment: Dict[str, Any]) -> SelectionResult:
         """Handle cases with insufficient data"""
         logger.warning(f"Insufficient data ({len(data)} points) for advanced modeling")
         
@@ -160,60 +398,62 @@ class SmartModelSelector:
         self.selected_model = "simple_forecast"
         self.selection_reason = f"Insufficient data ({len(data)} points) for Prophet/ARIMA models"
         
-        return {
-            'selected_model': self.selected_model,
-            'selection_reason': self.selection_reason,
-            'data_assessment': assessment,
-            'forecast_method': 'linear_trend',
-            'confidence': 'low',
-            'timestamp': datetime.now().isoformat()
-        }
+        return SelectionResult(
+            selected_model=self.selected_model,
+            selection_reason=self.selection_reason,
+            data_assessment=assessment,
+            forecast_method='linear_trend',
+            confidence='low',
+            timestamp=datetime.now().isoformat()
+        )
     
-    def _quick_selection(self, data: pd.DataFrame, assessment: Dict[str, Any]) -> Dict[str, Any]:
+    def _quick_selection(self, data: pd.DataFrame, assessment: Dict[str, Any]) -> SelectionResult:
         """Quick selection for moderate data sizes"""
         logger.info("Performing quick model selection...")
         
         # Default to Prophet for moderate data sizes
         try:
+            from enhanced_prophet_model import EnhancedProphetModel
             prophet_model = EnhancedProphetModel(self.metric_type)
             prophet_model.fit(data)
             
             self.selected_model = prophet_model
             self.selection_reason = f"Quick selection: Prophet chosen for {len(data)} data points"
             
-            return {
-                'selected_model': 'prophet',
-                'model_object': prophet_model,
-                'selection_reason': self.selection_reason,
-                'data_assessment': assessment,
-                'confidence': 'medium',
-                'timestamp': datetime.now().isoformat()
-            }
+            return SelectionResult(
+                selected_model='prophet',
+                model_object=prophet_model,
+                selection_reason=self.selection_reason,
+                data_assessment=assessment,
+                confidence='medium',
+                timestamp=datetime.now().isoformat()
+            )
             
         except Exception as e:
             logger.warning(f"Prophet quick selection failed: {e}, falling back to ARIMA")
             
             try:
+                from enhanced_arima_model import EnhancedARIMAModel
                 arima_model = EnhancedARIMAModel(self.metric_type)
                 arima_model.fit(data)
                 
                 self.selected_model = arima_model
                 self.selection_reason = f"Quick selection: ARIMA fallback after Prophet failure"
                 
-                return {
-                    'selected_model': 'arima',
-                    'model_object': arima_model,
-                    'selection_reason': self.selection_reason,
-                    'data_assessment': assessment,
-                    'confidence': 'medium',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return SelectionResult(
+                    selected_model='arima',
+                    model_object=arima_model,
+                    selection_reason=self.selection_reason,
+                    data_assessment=assessment,
+                    confidence='medium',
+                    timestamp=datetime.now().isoformat()
+                )
                 
             except Exception as e2:
                 logger.error(f"Both models failed in quick selection: {e2}")
                 return self._fallback_selection(f"Quick selection failed: {e2}")
     
-    def _full_evaluation_selection(self, data: pd.DataFrame, assessment: Dict[str, Any]) -> Dict[str, Any]:
+    def _full_evaluation_selection(self, data: pd.DataFrame, assessment: Dict[str, Any]) -> SelectionResult:
         """Full evaluation and comparison of models"""
         logger.info("Performing full model evaluation and selection...")
         
@@ -223,37 +463,26 @@ class SmartModelSelector:
         models_to_evaluate = {}
         evaluation_results = {}
         
-        # Try Prophet model
-        try:
-            logger.info("Training Prophet model...")
-            prophet_model = EnhancedProphetModel(self.metric_type)
-            prophet_model.fit(train_data)
-            models_to_evaluate['prophet'] = prophet_model
-            
-            # Evaluate Prophet
-            prophet_eval = self.performance_evaluator.evaluate_model(
-                prophet_model, train_data, test_data, 'prophet'
-            )
-            evaluation_results['prophet'] = prophet_eval
+        # Prophet and ARIMA fits are independent. Stan sampling and the LAPACK
+        # calls behind ARIMA release the GIL, so threads overlap them without
+        # forking (unsafe inside the threaded API server) or pickling models
+        with ThreadPoolExecutor(max_workers=len(FIT_EVAL_FUNCTIONS)) as executor:
+            futures = {
+                model_name: executor.submit(fit_eval, train_data, test_data, self.metric_type)
+                for model_name, fit_eval in FIT_EVAL_FUNCTIONS.items()
+            }
             
-        except Exception as e:
-            logger.warning(f"Prophet model training/evaluation failed: {e}")
+            for model_name, future in futures.items():
+                try:
+                    model, model_eval = future.result()
+                    models_to_evaluate[model_name] = model
+                    evaluation_results[model_name] = model_eval
+                    
+                except Exception as e:
+                    logger.warning(f"{model_name.capitalize()} model training/evaluation failed: {e}")
         
-        # Try ARIMA model
-        try:
-            logger.info("Training ARIMA model...")
-            arima_model = EnhancedARIMAModel(self.metric_type)
-            arima_model.fit(train_data)
-            models_to_evaluate['arima'] = arima_model
-            
-            # Evaluate ARIMA
-            arima_eval = self.performance_evaluator.evaluate_model(
-                arima_model, train_data, test_data, 'arima'
-            )
-            evaluation_results['arima'] = arima_eval
-            
-        except Exception as e:
-            logger.warning(f"ARIMA model training/evaluation failed: {e}")
+        # Workers evaluated with their own evaluator, so record results here
+        self.performance_evaluator.evaluation_results.update(evaluation_results)
         
         # Compare models and select best
         if evaluation_results:
@@ -262,37 +491,39 @@ class SmartModelSelector:
             
             if best_model_name in models_to_evaluate:
                 self.selected_model = models_to_evaluate[best_model_name]
+                if best_model_name == 'prophet':
+                    self.selected_model.set_uncertainty_samples()
                 self.selection_reason = f"Full evaluation: {best_model_name} selected based on performance comparison"
                 
-                return {
-                    'selected_model': best_model_name,
-                    'model_object': self.selected_model,
-                    'selection_reason': self.selection_reason,
-                    'data_assessment': assessment,
-                    'evaluation_results': evaluation_results,
-                    'comparison_results': comparison_results,
-                    'confidence': 'high',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return SelectionResult(
+                    selected_model=best_model_name,
+                    model_object=self.selected_model,
+                    selection_reason=self.selection_reason,
+                    data_assessment=assessment,
+                    evaluation_results=evaluation_results,
+                    comparison_results=comparison_results,
+                    confidence='high',
+                    timestamp=datetime.now().isoformat()
+                )
             else:
                 return self._fallback_selection("Best model not available in trained models")
         else:
             return self._fallback_selection("No models could be successfully trained and evaluated")
     
-    def _fallback_selection(self, error_message: str) -> Dict[str, Any]:
+    def _fallback_selection(self, error_message: str) -> SelectionResult:
         """Fallback selection when all else fails"""
         logger.error(f"Using fallback selection: {error_message}")
         
         self.selected_model = "simple_forecast"
         self.selection_reason = f"Fallback: {error_message}"
         
-        return {
-            'selected_model': 'simple_forecast',
-            'selection_reason': self.selection_reason,
-            'error': error_message,
-            'confidence': 'very_low',
-            'timestamp': datetime.now().isoformat()
-        }
+        return SelectionResult(
+            selected_model='simple_forecast',
+            selection_reason=self.selection_reason,
+            error=error_message,
+            confidence='very_low',
+            timestamp=datetime.now().isoformat()
+        )
     
     def get_model_recommendations(self, data_assessment: Dict[str, Any]) -> List[str]:
         """Get recommendations for improving model performance"""
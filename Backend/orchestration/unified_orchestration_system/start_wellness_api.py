@@ -10,6 +10,18 @@ import subprocess
 import time
 from pathlib import Path
 
+# Calls the selector's @njit(cache=True) seasonality kernel once per input
+# dtype (prepared series are float32, raw ones float64) so Numba writes the
+# compiled code to NUMBA_CACHE_DIR before the server starts
+NUMBA_WARMUP_SCRIPT = (
+    "import numpy as np\n"
+    "from smart_model_selector import NUMBA_AVAILABLE, _acf_two_lags\n"
+    "assert NUMBA_AVAILABLE\n"
+    "y = np.random.default_rng(0).standard_normal(50)\n"
+    "_acf_two_lags(y, 7, 30)\n"
+    "_acf_two_lags(y.astype(np.float32), 7, 30)\n"
+)
+
 def check_requirements():
     """Check if required packages are installed"""
     try:
@@ -55,6 +67,19 @@ def check_env_file():
     print("✓ Environment configuration found")
     return True
 
+def warm_numba_cache():
+    """Compile the model selector's Numba kernel into an on-disk cache shared with the server"""
+    script_dir = Path(__file__).resolve().parent
+    os.environ["NUMBA_CACHE_DIR"] = str(script_dir / ".numba_cache")
+
+    print("Warming forecasting JIT cache...")
+    try:
+        subprocess.run([sys.executable, "-c", NUMBA_WARMUP_SCRIPT], check=True, cwd=script_dir,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        print("✓ Forecasting JIT cache ready")
+    except subprocess.CalledProcessError:
+        print("✗ JIT warmup skipped (numba not available)")
+
 def start_simple_api():
     """Start the simple API server"""
     print("\n" + "="*60)
@@ -70,23 +95,23 @@ def start_simple_api():
     print("  POST /edumentor - Educational content")
     print("="*60)
     
+    warm_numba_cache()
+    
+    # Prefer the full orchestration API, falling back to the simple API
+    if Path("orchestration_api.py").exists():
+        print("Starting full orchestration system...")
+        script = "orchestration_api.py"
+    else:
+        print("Starting simple API...")
+        script = "simple_api.py"
+    
+    # Replace this process with the server instead of keeping a second
+    # interpreter resident just to wait on it; the server handles Ctrl+C
+    sys.stdout.flush()
     try:
-        # Try to start the full orchestration API first
-        if Path("orchestration_api.py").exists():
-            print("Starting full orchestration system...")
-            subprocess.run([sys.executable, "orchestration_api.py"], check=True)
-        else:
-            print("Starting simple API...")
-            subprocess.run([sys.executable, "simple_api.py"], check=True)
-    except KeyboardInterrupt:
-        print("\n\nServer stopped by user")
-    except subprocess.CalledProcessError as e:
+        os.execvp(sys.executable, [sys.executable, script])
+    except OSError as e:
         print(f"\n✗ Error starting server: {e}")
-        print("Trying simple API as fallback...")
-        try:
-            subprocess.run([sys.executable, "simple_api.py"], check=True)
-        except Exception as fallback_error:
-            print(f"✗ Fallback also failed: {fallback_error}")
 
 def main():
     """Main startup function"""
@@ -110,4 +135,7 @@ def main():
     start_simple_api()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nStartup interrupted by user")
@@ -5,13 +5,30 @@ Test script to verify Ollama wellness integration
 
 import requests
 import json
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+def timed_post(session, url, payload, timeout=120):
+    """POST payload and return (response, elapsed seconds)"""
+    start_time = time.time()
+    response = session.post(url, json=payload, timeout=timeout)
+    return response, time.time() - start_time
+
+def emit(lines):
+    """Write a block of output lines with a single write, then clear them"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+    lines.clear()
 
 def test_wellness_api():
     """Test the wellness API with Ollama integration"""
     
     base_url = "http://localhost:8007"
     
+    # One keep-alive session for every request below
+    session = requests.Session()
+    
     # Test data
     test_cases = [
         {
@@ -32,104 +49,107 @@ def test_wellness_api():
         }
     ]
     
-    print("🧪 Testing Ollama Wellness Integration")
-    print("=" * 50)
+    enhanced_data = {
+        "query": "I need help managing work-life balance",
+        "user_id": "test_user_3",
+        "mood_score": 5.0,
+        "stress_level": 7.0
+    }
+    
+    # Output is buffered per block and written with one call
+    lines = []
+    lines.append("🧪 Testing Ollama Wellness Integration")
+    lines.append("=" * 50)
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n{i}️⃣ {test_case['name']}")
-        print("-" * 30)
+    # Send every request up front (2 minute timeout each for Ollama) so the
+    # total wait is the slowest response rather than the sum
+    lines.append("📤 Sending requests to /wellness and /ask-wellness...")
+    emit(lines)
+    executor = ThreadPoolExecutor(max_workers=len(test_cases) + 1)
+    wellness_futures = [
+        executor.submit(timed_post, session, f"{base_url}/wellness", test_case["data"])
+        for test_case in test_cases
+    ]
+    enhanced_future = executor.submit(timed_post, session, f"{base_url}/ask-wellness", enhanced_data)
+    executor.shutdown(wait=False)
+    
+    for i, (test_case, future) in enumerate(zip(test_cases, wellness_futures), 1):
+        lines.append(f"\n{i}️⃣ {test_case['name']}")
+        lines.append("-" * 30)
         
         try:
-            # Test POST /wellness endpoint
-            print("📤 Sending request to /wellness...")
-            start_time = time.time()
-            
-            response = requests.post(
-                f"{base_url}/wellness",
-                json=test_case["data"],
-                timeout=120  # 2 minutes timeout for Ollama
-            )
-            
-            response_time = time.time() - start_time
+            # Result of POST /wellness
+            response, response_time = future.result()
             
-            print(f"⏱️  Response time: {response_time:.2f}s")
-            print(f"📊 Status code: {response.status_code}")
+            lines.append(f"⏱️  Response time: {response_time:.2f}s")
+            lines.append(f"📊 Status code: {response.status_code}")
             
             if response.status_code == 200:
                 data = response.json()
-                print("✅ Success!")
-                print(f"🔍 Query: {data.get('query', 'N/A')}")
-                print(f"📝 Response length: {len(data.get('response', ''))} chars")
-                print(f"🏷️  Endpoint: {data.get('endpoint', 'N/A')}")
+                lines.append("✅ Success!")
+                lines.append(f"🔍 Query: {data.get('query', 'N/A')}")
+                lines.append(f"📝 Response length: {len(data.get('response', ''))} chars")
+                lines.append(f"🏷️  Endpoint: {data.get('endpoint', 'N/A')}")
                 
                 # Show first 200 chars of response
                 response_text = data.get('response', '')
                 if response_text:
-                    print(f"💬 Response preview: {response_text[:200]}...")
+                    lines.append(f"💬 Response preview: {response_text[:200]}...")
                     
                     # Check if it looks like Ollama or fallback
                     if 'Thank you for reaching out' in response_text and 'gentle suggestions' in response_text:
-                        print("⚠️  WARNING: This looks like a hardcoded fallback response!")
+                        lines.append("⚠️  WARNING: This looks like a hardcoded fallback response!")
                     else:
-                        print("✅ Response appears to be LLM-generated (likely Ollama)")
+                        lines.append("✅ Response appears to be LLM-generated (likely Ollama)")
                 
             else:
-                print(f"❌ Error: {response.status_code}")
-                print(f"📄 Response: {response.text}")
+                lines.append(f"❌ Error: {response.status_code}")
+                lines.append(f"📄 Response: {response.text}")
                 
         except requests.exceptions.Timeout:
-            print("⏰ Request timed out (this might be normal for Ollama)")
+            lines.append("⏰ Request timed out (this might be normal for Ollama)")
         except requests.exceptions.ConnectionError:
-            print("❌ Connection error - is the server running on port 8007?")
+            lines.append("❌ Connection error - is the server running on port 8007?")
         except Exception as e:
-            print(f"❌ Error: {e}")
+            lines.append(f"❌ Error: {e}")
+        
+        emit(lines)
     
     # Test the enhanced endpoint
-    print(f"\n3️⃣ Enhanced wellness endpoint")
-    print("-" * 30)
+    lines.append(f"\n3️⃣ Enhanced wellness endpoint")
+    lines.append("-" * 30)
     
     try:
-        enhanced_data = {
-            "query": "I need help managing work-life balance",
-            "user_id": "test_user_3",
-            "mood_score": 5.0,
-            "stress_level": 7.0
-        }
-        
-        print("📤 Sending request to /ask-wellness...")
-        start_time = time.time()
-        
-        response = requests.post(
-            f"{base_url}/ask-wellness",
-            json=enhanced_data,
-            timeout=120
-        )
+        response, response_time = enhanced_future.result()
         
-        response_time = time.time() - start_time
-        
-        print(f"⏱️  Response time: {response_time:.2f}s")
-        print(f"📊 Status code: {response.status_code}")
+        lines.append(f"⏱️  Response time: {response_time:.2f}s")
+        lines.append(f"📊 Status code: {response.status_code}")
         
         if response.status_code == 200:
             data = response.json()
-            print("✅ Enhanced endpoint success!")
-            print(f"🔍 Query: {data.get('query', 'N/A')}")
-            print(f"👤 User context: {data.get('user_context', {})}")
-            print(f"🤖 LLM provider: {data.get('llm_provider', 'N/A')}")
-            print(f"📝 Response length: {len(data.get('response', ''))} chars")
+            lines.append("✅ Enhanced endpoint success!")
+            lines.append(f"🔍 Query: {data.get('query', 'N/A')}")
+            lines.append(f"👤 User context: {data.get('user_context', {})}")
+            lines.append(f"🤖 LLM provider: {data.get('llm_provider', 'N/A')}")
+            lines.append(f"📝 Response length: {len(data.get('response', ''))} chars")
             
             response_text = data.get('response', '')
             if response_text:
-                print(f"💬 Response preview: {response_text[:200]}...")
+                lines.append(f"💬 Response preview: {response_text[:200]}...")
         else:
-            print(f"❌ Enhanced endpoint error: {response.status_code}")
-            print(f"📄 Response: {response.text}")
+            lines.append(f"❌ Enhanced endpoint error: {response.status_code}")
+            lines.append(f"📄 Response: {response.text}")
             
     except Exception as e:
-        print(f"❌ Enhanced endpoint error: {e}")
+        lines.append(f"❌ Enhanced endpoint error: {e}")
+    
+    emit(lines)
+    
+    session.close()
     
-    print("\n" + "=" * 50)
-    print("🏁 Test completed!")
+    lines.append("\n" + "=" * 50)
+    lines.append("🏁 Test completed!")
+    emit(lines)
 
 if __name__ == "__main__":
     test_wellness_api()
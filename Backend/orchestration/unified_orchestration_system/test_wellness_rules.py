@@ -0,0 +1,58 @@
+"""
+Tests for the rule-based wellness responder in simple_api.py
+Crisis wording must always reach the LLM; canned answers are only for bare keyword queries
+"""
+
+import pytest
+
+from simple_api import SimpleOrchestrationEngine, WELLNESS_CRISIS_PATTERN
+
+
+@pytest.fixture
+def engine():
+    """Engine with only the rule matcher state set up (no LLMs or vector stores)"""
+    rule_engine = object.__new__(SimpleOrchestrationEngine)
+    rule_engine.wellness_rule_requests = 0
+    rule_engine.wellness_rule_hits = 0
+    return rule_engine
+
+
+CRISIS_QUERIES = [
+    "I want to die, I'm so stressed",
+    "I'm tired of living",
+    "I want to sleep forever and never wake up",
+    "I can't sleep, I keep thinking about ending my life",
+    "so anxious I want to disappear",
+    "stressed, thinking of overdosing on pills",
+]
+
+
+@pytest.mark.parametrize("query", CRISIS_QUERIES)
+def test_crisis_queries_go_to_llm(engine, query):
+    assert WELLNESS_CRISIS_PATTERN.search(query)
+    assert engine.match_wellness_rule(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "stressed",
+    "I'm so stressed",
+    "feeling anxious lately",
+    "I can't sleep",
+    "really tired",
+])
+def test_bare_keyword_queries_get_canned_response(engine, query):
+    assert engine.match_wellness_rule(query) is not None
+    assert engine.wellness_rule_hits == 1
+
+
+@pytest.mark.parametrize("query", [
+    "How do I deal with stress at work?",
+    "I'm anxious about my exam tomorrow",
+    "my baby won't sleep through the night",
+])
+def test_queries_with_extra_content_go_to_llm(engine, query):
+    assert engine.match_wellness_rule(query) is None
+
+
+def test_scores_skip_rules(engine):
+    assert engine.match_wellness_rule("stressed", {"stress_level": 8}) is None
@@ -8,6 +8,7 @@ Architecture:
 """
 
 import os
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 import sys
@@ -18,7 +19,7 @@ print(f"Python version: {sys.version}")
 # Try importing the necessary packages
 try:
     from fastapi import FastAPI, HTTPException, Query, Request, BackgroundTasks
-    from fastapi.responses import FileResponse, JSONResponse
+    from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
     print("FastAPI imported successfully")
 except ImportError as e:
     print(f"Error importing FastAPI: {e}")
@@ -32,6 +33,7 @@ import uvicorn
 import uuid
 from datetime import datetime, timedelta
 from enum import Enum
+from contextlib import asynccontextmanager
 import requests
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -192,11 +194,22 @@ device, gpu_available = get_compute_device()
 # Load environment variables
 load_dotenv()
 
+# Lifespan handler
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+    # Shutdown: close the pooled Ollama client if the generator was ever loaded
+    lesson_generator = sys.modules.get("generate_lesson_enhanced")
+    if lesson_generator is not None:
+        await lesson_generator.close_ollama_client()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Gurukul AI-Lesson Generator",
     description="Generate structured lessons based on ancient Indian wisdom texts",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -529,7 +542,7 @@ async def generate_lesson_background(task_id: str, subject: str, topic: str, use
         try:
             from generate_lesson_enhanced import create_enhanced_lesson
             # Use the include_wikipedia parameter, and assume knowledge store is enabled for background tasks
-            generated_lesson = create_enhanced_lesson(subject, topic, include_wikipedia, True)
+            generated_lesson = await create_enhanced_lesson(subject, topic, include_wikipedia, True)
         except ImportError:
             # Enhanced module is not available
             logger.error("Enhanced lesson generator module not available")
@@ -621,6 +634,24 @@ def cleanup_old_tasks():
         generation_results.pop(task_id, None)
         logger.info(f"Cleaned up old task: {task_id}")
 
+@app.get("/generate_lesson/stream")
+async def generate_lesson_stream(subject: str, topic: str):
+    """
+    Stream an Ollama-generated lesson as server-sent events
+
+    Tokens arrive as {"token": ...} events while Ollama generates them, so the
+    first text shows up in seconds instead of after the full generation. The
+    final {"done": true, "lesson": ...} event carries the parsed lesson.
+    """
+    from generate_lesson_enhanced import check_ollama_service, stream_ollama_lesson
+
+    # check_ollama_service shells out to `ollama list`, so keep it off the loop
+    ollama_running, model = await asyncio.to_thread(check_ollama_service)
+    if not (ollama_running and model):
+        raise HTTPException(status_code=503, detail="Ollama service is not available")
+
+    return StreamingResponse(stream_ollama_lesson(subject, topic, model), media_type="text/event-stream")
+
 @app.get("/generate_lesson")
 async def generate_lesson_get(
     subject: str,
@@ -641,7 +672,7 @@ async def generate_lesson_get(
         from generate_lesson_enhanced import create_enhanced_lesson
 
         # Create lesson data with enhanced functionality, passing the parameters
-        lesson_data = create_enhanced_lesson(subject, topic, include_wikipedia, use_knowledge_store)
+        lesson_data = await create_enhanced_lesson(subject, topic, include_wikipedia, use_knowledge_store)
 
         # Determine what sources to include based on parameters
         wikipedia_content = ""
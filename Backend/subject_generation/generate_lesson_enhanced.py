@@ -2,15 +2,18 @@
 generate_lesson_enhanced.py - Enhanced lesson generator that combines data from Wikipedia and Ollama
 """
 
+import asyncio
 import os
 import json
 import logging
-import re
 import subprocess
 import requests
 import time
+import weakref
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+
+from json_utils import extract_and_repair_json
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +26,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    logger.warning("httpx not available - async Ollama calls will run in a worker thread")
+
 def get_detailed_knowledge_base_sources(subject: str, topic: str) -> List[Dict[str, Any]]:
     """
     Get detailed source information from knowledge base including database and book sources
@@ -283,6 +293,29 @@ except ImportError as e:
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 DEFAULT_OLLAMA_MODEL = "llama3"
 FALLBACK_OLLAMA_MODELS = ["mistral", "phi", "gemma", "llama2"]
+OLLAMA_TIMEOUT = 120  # Seconds; generation can take up to 2 minutes
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+
+# Keep-alive client and concurrency limit per event loop (both are bound to
+# the loop they are first used on)
+_ollama_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def _get_ollama_client() -> Tuple["httpx.AsyncClient", asyncio.Semaphore]:
+    """Return the running loop's pooled Ollama client and semaphore, creating them on first use"""
+    loop = asyncio.get_running_loop()
+    if loop not in _ollama_clients:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=OLLAMA_MAX_CONCURRENCY, max_connections=100, keepalive_expiry=300.0),
+            timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=10.0)
+        )
+        _ollama_clients[loop] = (client, asyncio.Semaphore(OLLAMA_MAX_CONCURRENCY))
+    return _ollama_clients[loop]
+
+async def close_ollama_client():
+    """Close the running loop's pooled Ollama client"""
+    entry = _ollama_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].aclose()
 
 def check_ollama_service() -> Tuple[bool, str]:
     """
@@ -329,21 +362,21 @@ def check_ollama_service() -> Tuple[bool, str]:
         logger.error(f"Error checking Ollama service: {str(e)}")
         return False, ""
 
-def generate_with_ollama(subject: str, topic: str, model: str) -> Optional[Dict[str, Any]]:
+def _build_lesson_payload(subject: str, topic: str, model: str, stream: bool = False) -> Dict[str, Any]:
     """
-    Generate a lesson using Ollama
+    Build the Ollama /api/generate request body for a lesson
 
     Args:
         subject: The subject of the lesson
         topic: The topic of the lesson
         model: The Ollama model to use
+        stream: Ask Ollama for newline-delimited JSON chunks as tokens are generated
 
     Returns:
-        Optional[Dict[str, Any]]: The generated lesson or None if generation failed
+        Dict[str, Any]: The request payload
     """
-    try:
-        # Create a comprehensive prompt for Ollama
-        prompt = f"""
+    # Create a comprehensive prompt for Ollama
+    prompt = f"""
         Create a comprehensive, educational lesson on {topic} within the subject of {subject} based on ancient Indian wisdom traditions.
 
         The lesson should be structured as follows:
@@ -379,22 +412,85 @@ def generate_with_ollama(subject: str, topic: str, model: str) -> Optional[Dict[
         Ensure the content is authentic, respectful of the tradition, educationally valuable, and historically accurate.
         """
 
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "top_k": 40
+        }
+    }
+
+    return payload
+
+async def _parse_lesson_output(output_text: str, subject: str, topic: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the lesson from Ollama output text
+
+    The JSON extraction (and regex repair, when needed) runs in a worker
+    thread so that scrubbing a large response does not stall other
+    generations on the event loop.
+
+    Args:
+        output_text: The full generated text
+        subject: The subject of the lesson
+        topic: The topic of the lesson
+
+    Returns:
+        Optional[Dict[str, Any]]: The lesson or None if no valid JSON was found
+    """
+    # Plain-text answers skip the thread hop entirely
+    if "{" not in output_text:
+        logger.error("Could not find JSON object in Ollama response")
+        return None
+
+    required_fields = ["title", "shloka", "translation", "explanation", "activity", "question"]
+    lesson_data = await asyncio.to_thread(extract_and_repair_json, output_text, required_fields)
+    if not isinstance(lesson_data, dict):
+        return None
+
+    # Ensure all required fields are present
+    for field in required_fields:
+        if field not in lesson_data:
+            lesson_data[field] = f"Missing {field} information"
+
+    # Add subject and topic if not present
+    if "subject" not in lesson_data:
+        lesson_data["subject"] = subject
+    if "topic" not in lesson_data:
+        lesson_data["topic"] = topic
+
+    logger.info(f"Successfully generated lesson with Ollama: {lesson_data['title']}")
+    return lesson_data
+
+async def generate_with_ollama(subject: str, topic: str, model: str) -> Optional[Dict[str, Any]]:
+    """
+    Generate a lesson using Ollama without blocking the event loop
+
+    At most OLLAMA_MAX_CONCURRENCY requests per event loop are in flight at
+    once; further calls wait for a free slot.
+
+    Args:
+        subject: The subject of the lesson
+        topic: The topic of the lesson
+        model: The Ollama model to use
+
+    Returns:
+        Optional[Dict[str, Any]]: The generated lesson or None if generation failed
+    """
+    try:
+        payload = _build_lesson_payload(subject, topic, model)
+
         # Call Ollama API
         logger.info(f"Generating lesson with Ollama model: {model}")
-        response = requests.post(
-            OLLAMA_API_URL,
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "top_k": 40
-                }
-            },
-            timeout=120  # Increased timeout to 2 minutes
-        )
+        if HTTPX_AVAILABLE:
+            client, semaphore = _get_ollama_client()
+            async with semaphore:
+                response = await client.post(OLLAMA_API_URL, json=payload)
+        else:
+            response = await asyncio.to_thread(requests.post, OLLAMA_API_URL, json=payload, timeout=OLLAMA_TIMEOUT)
 
         if response.status_code != 200:
             logger.error(f"Ollama API error: {response.status_code} - {response.text}")
@@ -404,104 +500,83 @@ def generate_with_ollama(subject: str, topic: str, model: str) -> Optional[Dict[
         result = response.json()
         output_text = result.get("response", "")
 
-        # Extract JSON from the response
-        try:
-            # Find JSON object in the text
-            json_start = output_text.find("{")
-            json_end = output_text.rfind("}") + 1
-
-            if json_start >= 0 and json_end > json_start:
-                json_str = output_text[json_start:json_end]
-
-                # Clean the JSON string to remove control characters
-                # Remove control characters except newlines and tabs
-                json_str = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', json_str)
-                # Replace problematic quotes
-                json_str = json_str.replace('"', '"').replace('"', '"').replace(''', "'").replace(''', "'")
-
-                lesson_data = json.loads(json_str)
-
-                # Ensure all required fields are present
-                required_fields = ["title", "shloka", "translation", "explanation", "activity", "question"]
-                for field in required_fields:
-                    if field not in lesson_data:
-                        lesson_data[field] = f"Missing {field} information"
-
-                # Add subject and topic if not present
-                if "subject" not in lesson_data:
-                    lesson_data["subject"] = subject
-                if "topic" not in lesson_data:
-                    lesson_data["topic"] = topic
-
-                logger.info(f"Successfully generated lesson with Ollama: {lesson_data['title']}")
-                return lesson_data
-            else:
-                logger.error("Could not find JSON object in Ollama response")
-                return None
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing JSON from Ollama response: {str(e)}")
-            logger.error(f"Raw response: {output_text}")
-            logger.error(f"Extracted JSON string: {json_str if 'json_str' in locals() else 'Not extracted'}")
-
-            # Try to fix common JSON issues and retry
-            if 'json_str' in locals():
-                try:
-                    # Try to fix common issues
-                    fixed_json = json_str
-
-                    # Fix quotes inside string values - escape them properly
-                    # This regex finds quoted strings and escapes internal quotes
-                    def fix_quotes_in_strings(match):
-                        content = match.group(1)
-                        # Escape any unescaped quotes inside the string
-                        content = content.replace('\\"', '___ESCAPED_QUOTE___')  # Temporarily mark already escaped quotes
-                        content = content.replace('"', '\\"')  # Escape unescaped quotes
-                        content = content.replace('___ESCAPED_QUOTE___', '\\"')  # Restore escaped quotes
-                        return f'"{content}"'
-
-                    # Apply the fix to all string values
-                    fixed_json = re.sub(r'"([^"]*(?:\\"[^"]*)*)"', fix_quotes_in_strings, fixed_json)
-
-                    # Fix trailing commas
-                    fixed_json = re.sub(r',(\s*[}\]])', r'\1', fixed_json)
-                    # Fix missing quotes around keys
-                    fixed_json = re.sub(r'(\w+):', r'"\1":', fixed_json)
-                    # Fix single quotes (but be careful not to break escaped quotes)
-                    fixed_json = re.sub(r"(?<!\\)'", '"', fixed_json)
-
-                    lesson_data = json.loads(fixed_json)
-                    logger.info("Successfully parsed JSON after fixing common issues")
-
-                    # Ensure all required fields are present
-                    required_fields = ["title", "shloka", "translation", "explanation", "activity", "question"]
-                    for field in required_fields:
-                        if field not in lesson_data:
-                            lesson_data[field] = f"Missing {field} information"
-
-                    # Add subject and topic if not present
-                    if "subject" not in lesson_data:
-                        lesson_data["subject"] = subject
-                    if "topic" not in lesson_data:
-                        lesson_data["topic"] = topic
-
-                    logger.info(f"Successfully generated lesson with Ollama (after JSON fix): {lesson_data['title']}")
-                    return lesson_data
-
-                except json.JSONDecodeError as e2:
-                    logger.error(f"Still couldn't parse JSON after fixes: {str(e2)}")
-                    logger.error(f"Fixed JSON string: {fixed_json}")
-
-            return None
+        return await _parse_lesson_output(output_text, subject, topic)
 
     except Exception as e:
         logger.error(f"Error generating lesson with Ollama: {str(e)}")
         return None
 
-def create_enhanced_lesson(subject: str, topic: str, include_wikipedia: bool = True, use_knowledge_store: bool = True) -> Dict[str, Any]:
+def _sse_event(payload: Dict[str, Any]) -> str:
+    """Frame a payload as one server-sent event"""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+async def stream_ollama_lesson(subject: str, topic: str, model: str) -> AsyncIterator[str]:
+    """
+    Stream a lesson from Ollama as server-sent events
+
+    Each generated token is sent as {"token": ...} the moment Ollama produces
+    it. The lesson JSON is only extracted once Ollama reports done, so partial
+    output is never parsed; the final event carries it as
+    {"done": true, "lesson": ...} (lesson is null if no valid JSON came back).
+
+    Args:
+        subject: The subject of the lesson
+        topic: The topic of the lesson
+        model: The Ollama model to use
+
+    Yields:
+        str: SSE-framed events for a StreamingResponse
+    """
+    chunks = []
+    try:
+        logger.info(f"Streaming lesson from Ollama model: {model}")
+        if HTTPX_AVAILABLE:
+            payload = _build_lesson_payload(subject, topic, model, stream=True)
+            client, semaphore = _get_ollama_client()
+            async with semaphore:
+                async with client.stream("POST", OLLAMA_API_URL, json=payload) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        logger.error(f"Ollama API error: {response.status_code} - {response.text}")
+                        yield _sse_event({"error": f"Ollama API error: {response.status_code}"})
+                        return
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = chunk.get("response")
+                        if token:
+                            chunks.append(token)
+                            yield _sse_event({"token": token})
+                        if chunk.get("done"):
+                            break
+        else:
+            # Without an async client the whole response arrives as one token
+            payload = _build_lesson_payload(subject, topic, model)
+            response = await asyncio.to_thread(requests.post, OLLAMA_API_URL, json=payload, timeout=OLLAMA_TIMEOUT)
+            if response.status_code != 200:
+                logger.error(f"Ollama API error: {response.status_code} - {response.text}")
+                yield _sse_event({"error": f"Ollama API error: {response.status_code}"})
+                return
+            token = response.json().get("response", "")
+            chunks.append(token)
+            yield _sse_event({"token": token})
+    except Exception as e:
+        logger.error(f"Error streaming lesson from Ollama: {str(e)}")
+        yield _sse_event({"error": str(e)})
+        return
+
+    lesson = await _parse_lesson_output("".join(chunks), subject, topic)
+    yield _sse_event({"done": True, "lesson": lesson})
+
+async def create_enhanced_lesson(subject: str, topic: str, include_wikipedia: bool = True, use_knowledge_store: bool = True) -> Dict[str, Any]:
     """
     Create an enhanced lesson by combining data from multiple sources
 
+    The Ollama call shares the event loop's pooled client and concurrency
+    limit; the Wikipedia, Ollama service and knowledge base lookups block,
+    so they run in worker threads.
+
     Args:
         subject: The subject of the lesson
         topic: The topic of the lesson
@@ -538,7 +613,7 @@ def create_enhanced_lesson(subject: str, topic: str, include_wikipedia: bool = T
     # Step 1: Get Wikipedia information (only if requested)
     if include_wikipedia:
         try:
-            wiki_data = get_relevant_wikipedia_info(subject, topic)
+            wiki_data = await asyncio.to_thread(get_relevant_wikipedia_info, subject, topic)
             if wiki_data["wikipedia"]["title"]:
                 lesson_data["wikipedia_info"] = {
                     "title": wiki_data["wikipedia"]["title"],
@@ -581,10 +656,10 @@ def create_enhanced_lesson(subject: str, topic: str, include_wikipedia: bool = T
 
     # Step 2: Generate content with Ollama
     ollama_success = False
-    ollama_running, model = check_ollama_service()
+    ollama_running, model = await asyncio.to_thread(check_ollama_service)
     if ollama_running and model:
         try:
-            ollama_lesson = generate_with_ollama(subject, topic, model)
+            ollama_lesson = await generate_with_ollama(subject, topic, model)
             if ollama_lesson and ollama_lesson.get("explanation"):
                 # Update lesson data with Ollama-generated content
                 for key in ["title", "shloka", "translation", "explanation", "activity", "question"]:
@@ -624,7 +699,7 @@ def create_enhanced_lesson(subject: str, topic: str, include_wikipedia: bool = T
         logger.info("Fetching detailed knowledge base sources...")
         try:
             logger.info(">>> DEBUG: Calling get_detailed_knowledge_base_sources...")
-            detailed_kb_sources = get_detailed_knowledge_base_sources(subject, topic)
+            detailed_kb_sources = await asyncio.to_thread(get_detailed_knowledge_base_sources, subject, topic)
             logger.info(f">>> DEBUG: get_detailed_knowledge_base_sources returned {len(detailed_kb_sources) if detailed_kb_sources else 0} sources")
 
             if detailed_kb_sources:
@@ -818,13 +893,20 @@ def create_enhanced_lesson(subject: str, topic: str, include_wikipedia: bool = T
 
 
 
+async def _create_lesson_and_close(subject: str, topic: str) -> Dict[str, Any]:
+    """Create one lesson on a fresh event loop, closing the loop's Ollama client afterwards"""
+    try:
+        return await create_enhanced_lesson(subject, topic)
+    finally:
+        await close_ollama_client()
+
 if __name__ == "__main__":
     # Test the module
     test_subject = "Ganita"
     test_topic = "Algebra"
 
     print(f"Testing enhanced lesson generation for {test_subject}/{test_topic}")
-    lesson = create_enhanced_lesson(test_subject, test_topic)
+    lesson = asyncio.run(_create_lesson_and_close(test_subject, test_topic))
 
     print(f"Generated lesson: {lesson['title']}")
     print(f"Sources: {lesson['sources']}")
@@ -2,25 +2,54 @@
 generate_lesson_ollama.py - Script to generate a lesson using Ollama directly
 """
 
+import asyncio
 import json
 import argparse
-import re
 import os
 import logging
 import requests
 
+from json_utils import extract_and_repair_json
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def generate_lesson(subject, topic):
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    logger.warning("httpx not available - async Ollama calls will run in a worker thread")
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_TIMEOUT = 120  # Seconds; generation can take up to 2 minutes
+
+async def _ollama_request(client, method, path, **kwargs):
+    """Send a request to Ollama with httpx, or with requests in a worker thread"""
+    if client is not None:
+        return await client.request(method, path, **kwargs)
+    return await asyncio.to_thread(
+        requests.request, method, f"{OLLAMA_BASE_URL}{path}", timeout=OLLAMA_TIMEOUT, **kwargs
+    )
+
+async def generate_lesson(subject, topic):
+    """
+    Generate a lesson using Ollama without blocking the event loop
+    """
+    if HTTPX_AVAILABLE:
+        async with httpx.AsyncClient(base_url=OLLAMA_BASE_URL, timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=10.0)) as client:
+            return await _generate_lesson(client, subject, topic)
+    return await _generate_lesson(None, subject, topic)
+
+async def _generate_lesson(client, subject, topic):
     """
-    Generate a lesson using Ollama
+    Generate a lesson over the given httpx client (None to use requests)
     """
     try:
         # Check if Ollama is available and running
         try:
-            response = requests.get("http://localhost:11434/api/tags")
+            response = await _ollama_request(client, "GET", "/api/tags")
             if response.status_code != 200:
                 logger.error("Ollama API is not responding")
                 return None
@@ -59,8 +88,8 @@ def generate_lesson(subject, topic):
 
         # Generate the lesson using Ollama API
         logger.info("Generating lesson with Ollama...")
-        response = requests.post(
-            "http://localhost:11434/api/generate",
+        response = await _ollama_request(
+            client, "POST", "/api/generate",
             json={
                 "model": model,
                 "prompt": prompt,
@@ -78,32 +107,16 @@ def generate_lesson(subject, topic):
         output = response_json.get('response', '').strip()
         logger.info(f"Ollama output received. Length: {len(output)} characters")
 
-        # Try to parse the JSON response
+        # Find the lesson object in the output, repairing it if needed
+        required_fields = ["title", "shloka", "translation", "explanation", "activity", "question"]
         try:
-            # First try direct JSON parsing
-            try:
-                lesson = json.loads(output)
-                logger.info("Successfully parsed JSON directly")
-            except json.JSONDecodeError:
-                # If that fails, try to extract JSON from markdown or text
-                json_match = re.search(r'```json\s*(.*?)\s*```', output, re.DOTALL)
-                if json_match:
-                    lesson_text = json_match.group(1)
-                    lesson = json.loads(lesson_text)
-                    logger.info("Found and parsed JSON from code block")
-                else:
-                    # Try to find JSON object directly in text
-                    json_match = re.search(r'({.*})', output, re.DOTALL)
-                    if json_match:
-                        lesson_text = json_match.group(1)
-                        lesson = json.loads(lesson_text)
-                        logger.info("Found and parsed JSON from text")
-                    else:
-                        logger.error("Could not find valid JSON in response")
-                        return None
+            lesson = extract_and_repair_json(output, required_fields)
+            if lesson is None:
+                logger.error("Could not find valid JSON in response")
+                logger.error(f"Raw output: {output}")
+                return None
 
             # Validate the lesson structure
-            required_fields = ["title", "shloka", "translation", "explanation", "activity", "question"]
             for field in required_fields:
                 if field not in lesson:
                     raise ValueError(f"Missing required field: {field}")
@@ -111,10 +124,6 @@ def generate_lesson(subject, topic):
             logger.info("Successfully generated and validated lesson")
             return lesson
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON: {e}")
-            logger.error(f"Raw output: {output}")
-            return None
         except ValueError as e:
             logger.error(f"Invalid lesson structure: {e}")
             return None
@@ -133,7 +142,7 @@ def main():
 
     args = parser.parse_args()
 
-    lesson = generate_lesson(args.subject, args.topic)
+    lesson = asyncio.run(generate_lesson(args.subject, args.topic))
 
     if lesson:
         print(json.dumps(lesson, indent=2, ensure_ascii=False))
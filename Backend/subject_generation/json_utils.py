@@ -0,0 +1,137 @@
+"""
+json_utils.py - Utility functions for extracting JSON objects from LLM output
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# strict=False accepts raw newlines and tabs inside strings, which models
+# emit all the time in long explanations
+_DECODER = json.JSONDecoder(strict=False)
+
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+_OPEN_BRACE = re.compile(r'\{')
+_QUOTED_STRING = re.compile(r'"([^"]*(?:\\"[^"]*)*)"')
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_BARE_KEY = re.compile(r'(\w+):')
+_SINGLE_QUOTE = re.compile(r"(?<!\\)'")
+
+# Typographic quotes models sometimes use as JSON delimiters
+_SMART_QUOTES = str.maketrans({
+    "\u201c": '"', "\u201d": '"',
+    "\u2018": "'", "\u2019": "'"
+})
+
+
+def _fix_quotes_in_strings(match: "re.Match") -> str:
+    """Escape unescaped quotes inside a quoted string"""
+    content = match.group(1)
+    content = content.replace('\\"', '___ESCAPED_QUOTE___')  # Temporarily mark already escaped quotes
+    content = content.replace('"', '\\"')  # Escape unescaped quotes
+    content = content.replace('___ESCAPED_QUOTE___', '\\"')  # Restore escaped quotes
+    return f'"{content}"'
+
+
+def find_json_object(text: str, required_keys: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Return the first valid JSON object embedded in text
+
+    Each '{' is tried in turn with JSONDecoder.raw_decode, which stops at the
+    end of the object it decodes, so surrounding prose or markdown fences do
+    not need to be stripped first.
+
+    Args:
+        text: Text that may contain a JSON object
+        required_keys: Keys an object must contain to be returned
+
+    Returns:
+        Optional[Dict[str, Any]]: The decoded object or None if there is none
+    """
+    required = set(required_keys)
+    for match in _OPEN_BRACE.finditer(text):
+        try:
+            obj, _ = _DECODER.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(obj, dict) and required <= obj.keys():
+            return obj
+    return None
+
+
+def repair_json(json_str: str) -> str:
+    """
+    Apply regex fixes for common LLM JSON mistakes
+
+    Removes control characters and typographic quotes, escapes stray quotes
+    inside strings, drops trailing commas, quotes bare keys and converts
+    single quotes.
+
+    Args:
+        json_str: Candidate JSON text
+
+    Returns:
+        str: The repaired text (not guaranteed to be valid JSON)
+    """
+    fixed_json = _CONTROL_CHARS.sub('', json_str).translate(_SMART_QUOTES)
+    fixed_json = _QUOTED_STRING.sub(_fix_quotes_in_strings, fixed_json)
+    fixed_json = _TRAILING_COMMA.sub(r'\1', fixed_json)
+    fixed_json = _BARE_KEY.sub(r'"\1":', fixed_json)
+    fixed_json = _SINGLE_QUOTE.sub('"', fixed_json)
+    return fixed_json
+
+
+def extract_and_repair_json(text: str, required_keys: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Extract the JSON object from generated text, repairing it if needed
+
+    The object starting at the first '{' is decoded as-is first. Failing
+    that, a later object is accepted only if it has all required_keys, so a
+    nested object inside a malformed outer one is not mistaken for the
+    result. Otherwise the regex repairs are applied to the outermost span
+    from the first '{' to the last '}'. Nested objects without the required
+    keys are only tried after the repair fails.
+
+    Args:
+        text: The full generated text
+        required_keys: Keys the extracted object is expected to contain
+
+    Returns:
+        Optional[Dict[str, Any]]: The decoded object or None if no valid JSON was found
+    """
+    json_start = text.find("{")
+    json_end = text.rfind("}") + 1
+    if json_start == -1 or json_end <= json_start:
+        logger.error("Could not find JSON object in LLM response")
+        return None
+
+    try:
+        obj, _ = _DECODER.raw_decode(text, json_start)
+    except json.JSONDecodeError:
+        obj = None
+    if isinstance(obj, dict):
+        return obj
+
+    required = tuple(required_keys)
+    if required:
+        obj = find_json_object(text, required)
+        if obj is not None:
+            return obj
+
+    fixed_json = repair_json(text[json_start:json_end])
+    try:
+        obj = json.loads(fixed_json, strict=False)
+    except json.JSONDecodeError as e:
+        logger.error(f"Still couldn't parse JSON after fixes: {str(e)}")
+        logger.error(f"Fixed JSON string: {fixed_json}")
+        obj = None
+
+    if isinstance(obj, dict):
+        logger.info("Successfully parsed JSON after fixing common issues")
+        return obj
+    if required:
+        return None
+    return find_json_object(text)
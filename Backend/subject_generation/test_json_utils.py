@@ -0,0 +1,31 @@
+"""
+Tests for lesson JSON extraction in json_utils.py
+"""
+
+from json_utils import extract_and_repair_json
+
+LESSON_FIELDS = ["title", "shloka", "translation", "explanation", "activity", "question"]
+
+
+def test_valid_lesson_inside_prose():
+    text = 'Here is your lesson:\n```json\n{"title": "Plants", "activity": {"name": "Leaf test"}}\n```'
+    lesson = extract_and_repair_json(text)
+    assert lesson == {"title": "Plants", "activity": {"name": "Leaf test"}}
+
+
+def test_trailing_comma_repairs_outer_object_not_nested_one():
+    text = (
+        '{"title": "Photosynthesis", "shloka": "", "translation": "", '
+        '"explanation": "How plants make food", '
+        '"activities": [{"name": "Leaf test", "steps": "Boil a leaf"},], '
+        '"activity": "Leaf test", "question": "What do leaves need?"}'
+    )
+    for required_keys in ((), LESSON_FIELDS):
+        lesson = extract_and_repair_json(text, required_keys)
+        assert lesson["title"] == "Photosynthesis"
+        assert lesson["activities"] == [{"name": "Leaf test", "steps": "Boil a leaf"}]
+
+
+def test_unrepairable_outer_object_does_not_return_nested_one():
+    text = '{"title": "Broken" "activities": [{"name": "Leaf test"}]'
+    assert extract_and_repair_json(text, LESSON_FIELDS) is None